@@ -1,16 +1,62 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Any, Dict
+from typing import Any, Dict, List, NamedTuple, Optional
 
-from coa_logic import calculate_coa_score
-from soa_logic import calculate_soa_score
-from ir_model import calculate_ir
-from fr_logic import calculate_fr_score
+from coa_logic import COA_SPACE, calculate_coa_score, calculate_coa_scores
+from soa_logic import SOA_SPACE, calculate_soa_score, calculate_soa_scores
+import ir_model
+from ir_model import calculate_ir, generate_matrix, resolve_industry
+from fr_logic import calculate_fr_score, calculate_fr_trajectory
+from fr_portfolio import calculate_fr_scores
+from fr_sensitivity import calculate_fr_sensitivity
+from composite_logic import COMPOSITE_WEIGHTS, calculate_full_score, calculate_full_scores
+from stream_scoring import NDJSONStreamingResponse, score_ndjson_stream
+from fr_cache import ResultCache, if_none_match, payload_key
+from serialization import FastJSONResponse, dumps, json_response
+from scoring_policy import (
+    DEFAULT_POLICY, POLICIES, PRODUCTION, ScoringPolicy, get_policy, score_coa, score_fr, score_ir, score_soa
+)
+from fast_decode import CodeDecoder, openapi_body, register_openapi_models
+from metrics import REGISTRY, MetricsMiddleware, timed
+from profiling import PROFILE_HEADER, profile_authorized, run_profiled
+from precompressed import PrecompressedBody, PrecompressedCache
+from policy_reload import POLICY_FILE, PolicyWatcher, policy_status
 from fastapi import Body
 
 
-app = FastAPI(title="COA + SOA + IR + FR Fast Engine")
+app = FastAPI(title="COA + SOA + IR + FR Fast Engine", default_response_class=FastJSONResponse)
+
+# serialized /fr/score responses keyed by payload hash
+FR_CACHE = ResultCache(max_entries=1024, ttl_seconds=300)
+
+
+# /ir/matrix bytes (identity, gzip, br); rebuilt only when the IR policy is replaced
+IR_MATRIX = PrecompressedCache(
+    ir_model.current_state,
+    lambda state: dumps(generate_matrix(state.industry_data))
+)
+
+# full COA / SOA score spaces; fixed for the life of the process
+COA_DISTRIBUTION = PrecompressedBody(dumps(COA_SPACE.distribution()))
+SOA_DISTRIBUTION = PrecompressedBody(dumps(SOA_SPACE.distribution()))
+
+# industry policy from INDUSTRY_DATA_FILE, hot-reloaded; industry_data.py otherwise
+POLICY_WATCHER = PolicyWatcher(POLICY_FILE) if POLICY_FILE else None
+
+
+@app.on_event("startup")
+def start_policy_watcher():
+    if POLICY_WATCHER is not None:
+        POLICY_WATCHER.load()  # a bad file stops startup here
+        POLICY_WATCHER.start()
+
+
+@app.on_event("shutdown")
+def stop_policy_watcher():
+    if POLICY_WATCHER is not None:
+        POLICY_WATCHER.stop()
 
 
 # CORS (ALLOW ALL)
@@ -23,6 +69,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# per-route request counts, errors and latency histograms, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # -----------------------------
 # INPUT MODELS
 # -----------------------------
@@ -35,6 +84,15 @@ class CoaInput(BaseModel):
     fraud_litigation: int = Field(..., ge=1, le=4)
 
 
+COA_DECODER = CodeDecoder(CoaInput)
+
+
+class CoaBatchInput(BaseModel):
+    # either one dict per borrower, or one list of codes per field
+    rows: Optional[List[Dict[str, int]]] = None
+    columns: Optional[Dict[str, List[Optional[int]]]] = None
+
+
 class SoaInput(BaseModel):
     year_in_business: int = Field(..., ge=1, le=4)
     location: int = Field(..., ge=1, le=3)
@@ -44,10 +102,159 @@ class SoaInput(BaseModel):
     nationalization: int = Field(..., ge=1, le=5)
 
 
+SOA_DECODER = CodeDecoder(SoaInput)
+register_openapi_models(app, CoaInput, SoaInput)
+
+
+class SoaBatchInput(BaseModel):
+    columns: Optional[Dict[str, List[Optional[int]]]] = None
+    rows: Optional[List[Dict[str, int]]] = None
+
+
 class IRInput(BaseModel):
     industry: str
 
 
+class FullScoreInput(BaseModel):
+    coa: CoaInput
+    soa: SoaInput
+    ir: IRInput
+    fr: Dict[str, Any]
+    # inter-score weights keyed coa/soa/ir/fr; missing keys use the defaults
+    weights: Optional[Dict[str, float]] = None
+
+
+class FrBatchInput(BaseModel):
+    # either /fr/score payloads, or a (borrowers, years, 16) array in fr_logic.INPUT_METRICS order
+    borrowers: Optional[List[Dict[str, Dict[str, float]]]] = None
+    data: Optional[List[List[List[float]]]] = None
+
+
+class FrPerturbation(BaseModel):
+    # one of fr_logic.INPUT_METRICS, scaled by (1 + change_percent / 100)
+    metric: str
+    change_percent: float
+    # years of the scoring window to change; all three when omitted
+    years: Optional[List[str]] = None
+
+
+class FrSensitivityInput(BaseModel):
+    # same year -> metrics body as /fr/score
+    financials: Dict[str, Dict[str, float]]
+    perturbations: Optional[List[FrPerturbation]] = None
+    # without perturbations: every input metric at each of these percentages
+    steps: Optional[List[float]] = None
+
+
+# FR: sample year -> metrics body shown in /docs
+FR_EXAMPLE = {
+    "2022": {
+        "Net Sales": 116218.0,
+        "COGS": 93951.0,
+        "Total Liabilities": 121306.0,
+        "EBITDA": 10775.0,
+        "EBIT": 10775.0,
+        "Current Assets": 128622.0,
+        "Current Liabilities": 118787.0,
+        "Interest Payments": 2682.0,
+        "Debt Service": 38165.0,
+        "Trade and other receivables": 59631.0,
+        "Trade Creditors": 79816.0,
+        "Shareholders Equity": 9949.0,
+        "Intangible assets": 35.0,
+        "Operating Cash flows": 11043.0,
+        "Net Profit": 7825.0,
+        "Inventory": 41131.0
+    },
+    "2023": {
+        "Net Sales": 117554.0,
+        "COGS": 93319.0,
+        "Total Liabilities": 112566.0,
+        "EBITDA": 14567.0,
+        "EBIT": 14567.0,
+        "Current Assets": 111109.0,
+        "Current Liabilities": 105687.0,
+        "Interest Payments": 5317.0,
+        "Debt Service": 70119.0,
+        "Trade and other receivables": 29104.0,
+        "Trade Creditors": 35297.0,
+        "Shareholders Equity": 18867.0,
+        "Intangible assets": 25.0,
+        "Operating Cash flows": 14900.0,
+        "Net Profit": 8917.0,
+        "Inventory": 7124.0
+    },
+    "2024": {
+        "Net Sales": 135572.0,
+        "COGS": 106486.0,
+        "Total Liabilities": 153607.0,
+        "EBITDA": 17926.0,
+        "EBIT": 17926.0,
+        "Current Assets": 161490.0,
+        "Current Liabilities": 138351.0,
+        "Interest Payments": 9744.0,
+        "Debt Service": 76210.0,
+        "Trade and other receivables": 19641.0,
+        "Trade Creditors": 60131.0,
+        "Shareholders Equity": 26392.0,
+        "Intangible assets": 15.0,
+        "Operating Cash flows": 18582.0,
+        "Net Profit": 7526.0,
+        "Inventory": 18289.0
+    }
+}
+
+
+# -----------------------------
+# SCORING POLICY SELECTION
+# -----------------------------
+# Single-score routes take ?policy=<name> (or X-Scoring-Policy) to score under a
+# named policy version, and ?compare=<name> (or X-Scoring-Compare) to also score
+# under a second one, e.g. champion vs challenger, from the same parsed inputs.
+POLICY_HEADER = "x-scoring-policy"
+COMPARE_HEADER = "x-scoring-compare"
+
+
+class PolicyParams(NamedTuple):
+    policy: Optional[str]
+    compare: Optional[str]
+
+
+def policy_params(
+    policy: Optional[str] = Query(
+        None, description="Scoring policy version to score under (see /scoring/policies); default: the configured default"
+    ),
+    compare: Optional[str] = Query(
+        None, description="Second policy version, scored from the same inputs and returned under 'compare'"
+    ),
+    policy_header: Optional[str] = Header(None, alias=POLICY_HEADER, description="Same as ?policy="),
+    compare_header: Optional[str] = Header(None, alias=COMPARE_HEADER, description="Same as ?compare="),
+) -> PolicyParams:
+    # a dependency rather than raw query_params, so the parameters show up in /docs
+    return PolicyParams(policy or policy_header, compare or compare_header)
+
+
+def _policy_selection(params: PolicyParams) -> Optional[List[ScoringPolicy]]:
+    """
+    Requested [policy] or [policy, compare], or None for the default production
+    tables. Raises ValueError for unknown names.
+    """
+    if params.policy is None and params.compare is None and DEFAULT_POLICY == PRODUCTION:
+        return None
+    policies = [get_policy(params.policy)]
+    if params.compare:
+        policies.append(get_policy(params.compare))
+    return policies
+
+
+def _with_policies(policies: List[ScoringPolicy], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # first policy's result at the top level, the compared one under "compare"
+    out = {**results[0], "policy": policies[0].name}
+    if len(policies) > 1:
+        out["compare"] = {**results[1], "policy": policies[1].name}
+    return out
+
+
 @app.get("/")
 def root():
     return {
@@ -65,112 +272,320 @@ def root():
 # -----------------------------
 # API ENDPOINTS
 # -----------------------------
-@app.post("/coa/score")
-def get_coa_score(payload: CoaInput):
+@app.post("/coa/score", openapi_extra=openapi_body(CoaInput))
+async def get_coa_score(request: Request, selection: PolicyParams = Depends(policy_params)):
+    # body is CoaInput, validated by COA_DECODER without building the model
+    codes = COA_DECODER.decode(await request.body(), request.headers.get("content-type"))
     try:
-        return {"coa_score": calculate_coa_score(payload.dict())}
+        with timed("score"):
+            policies = _policy_selection(selection)
+            if policies is None:
+                result = {"coa_score": calculate_coa_score(codes)}
+            else:
+                result = _with_policies(policies, [{"coa_score": s} for s in score_coa(codes, policies)])
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
 
 
-@app.post("/soa/score")
-def get_soa_score(payload: SoaInput):
+@app.post("/coa/score/batch")
+def get_coa_score_batch(payload: CoaBatchInput):
     try:
-        return {"soa_score": calculate_soa_score(payload.dict())}
+        with timed("score"):
+            result = calculate_coa_scores(rows=payload.rows, columns=payload.columns)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
 
 
-@app.post("/ir/score")
-def get_ir_score(payload: IRInput):
+@app.get("/coa/score/distribution")
+def get_coa_score_distribution(request: Request):
     """
-    Input: industry name
-    Output: industry + IR score only
+    Every COA input combination and its score (see ScoreSpace.distribution):
+    field codes and strides, the score table in index order and the count
+    of combinations per distinct score.
     """
+    return COA_DISTRIBUTION.response(request)
+
+
+@app.post("/soa/score", openapi_extra=openapi_body(SoaInput))
+async def get_soa_score(request: Request, selection: PolicyParams = Depends(policy_params)):
+    # body is SoaInput, validated by SOA_DECODER without building the model
+    codes = SOA_DECODER.decode(await request.body(), request.headers.get("content-type"))
     try:
-        result = calculate_ir(payload.industry)
+        with timed("score"):
+            policies = _policy_selection(selection)
+            if policies is None:
+                result = {"soa_score": calculate_soa_score(codes)}
+            else:
+                result = _with_policies(policies, [{"soa_score": s} for s in score_soa(codes, policies)])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
 
-        # defensive: result may be dict or number
-        if isinstance(result, dict):
-            score = result.get("ir_score") or result.get("score") or None
-        else:
-            score = result
 
-        if score is None:
-            raise ValueError("IR score not found in model output")
+@app.post("/soa/score/batch")
+def get_soa_score_batch(payload: SoaBatchInput):
+    try:
+        with timed("score"):
+            result = calculate_soa_scores(rows=payload.rows, columns=payload.columns)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
+
+
+@app.get("/soa/score/distribution")
+def get_soa_score_distribution(request: Request):
+    """
+    Every SOA input combination and its score; same layout as /coa/score/distribution.
+    """
+    return SOA_DISTRIBUTION.response(request)
 
-        return {
-            "industry": payload.industry,
-            "ir_score": round(float(score), 3)
-        }
 
+@app.post("/ir/score")
+def get_ir_score(payload: IRInput, selection: PolicyParams = Depends(policy_params)):
+    """
+    Input: industry name; case, punctuation, common abbreviations and small typos are tolerated
+    Output: industry as sent, the industry it resolved to, match confidence and IR score
+    """
+    try:
+        with timed("score"):
+            policies = _policy_selection(selection)
+            # one policy version for resolving and scoring, whatever a reload swaps in meanwhile
+            state = ir_model.current_state()
+            match = resolve_industry(payload.industry, state)
+            if policies is None:
+                scores = [{"ir_score": calculate_ir(match.industry, state)["ir_score"]}]
+            else:
+                scores = [{"ir_score": s} for s in score_ir(match.industry, policies, state)]
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    result = {
+        "industry": payload.industry,
+        "resolved_industry": match.industry,
+        "match_confidence": match.confidence,
+        **scores[0]
+    }
+    if policies is not None:
+        result = _with_policies(policies, [result] + scores[1:])
+    return json_response(result)
+
+
+@app.get("/ir/matrix")
+def get_ir_matrix(request: Request):
+    """
+    Factor x industry matrix of qualitative values (see generate_matrix).
+    Served pre-serialized and pre-compressed per Accept-Encoding, with a
+    strong ETag per encoding; If-None-Match gives a 304.
+    """
+    return IR_MATRIX.get().response(request)
+
+
+@app.get("/ir/policy")
+def get_ir_policy():
+    """
+    Version and source of the industry policy data in use, and reload status.
+    """
+    return policy_status(POLICY_WATCHER)
+
 
 @app.post("/fr/score")
 def get_fr_score(
+    request: Request,
     payload: Dict[str, Any] = Body(
         ...,
-        example={
-            "2022": {
-                "Net Sales": 116218.0,
-                "COGS": 93951.0,
-                "Total Liabilities": 121306.0,
-                "EBITDA": 10775.0,
-                "EBIT": 10775.0,
-                "Current Assets": 128622.0,
-                "Current Liabilities": 118787.0,
-                "Interest Payments": 2682.0,
-                "Debt Service": 38165.0,
-                "Trade and other receivables": 59631.0,
-                "Trade Creditors": 79816.0,
-                "Shareholders Equity": 9949.0,
-                "Intangible assets": 35.0,
-                "Operating Cash flows": 11043.0,
-                "Net Profit": 7825.0,
-                "Inventory": 41131.0
-            },
-            "2023": {
-                "Net Sales": 117554.0,
-                "COGS": 93319.0,
-                "Total Liabilities": 112566.0,
-                "EBITDA": 14567.0,
-                "EBIT": 14567.0,
-                "Current Assets": 111109.0,
-                "Current Liabilities": 105687.0,
-                "Interest Payments": 5317.0,
-                "Debt Service": 70119.0,
-                "Trade and other receivables": 29104.0,
-                "Trade Creditors": 35297.0,
-                "Shareholders Equity": 18867.0,
-                "Intangible assets": 25.0,
-                "Operating Cash flows": 14900.0,
-                "Net Profit": 8917.0,
-                "Inventory": 7124.0
-            },
-            "2024": {
-                "Net Sales": 135572.0,
-                "COGS": 106486.0,
-                "Total Liabilities": 153607.0,
-                "EBITDA": 17926.0,
-                "EBIT": 17926.0,
-                "Current Assets": 161490.0,
-                "Current Liabilities": 138351.0,
-                "Interest Payments": 9744.0,
-                "Debt Service": 76210.0,
-                "Trade and other receivables": 19641.0,
-                "Trade Creditors": 60131.0,
-                "Shareholders Equity": 26392.0,
-                "Intangible assets": 15.0,
-                "Operating Cash flows": 18582.0,
-                "Net Profit": 7526.0,
-                "Inventory": 18289.0
-            }
-        }
-    )
+        example=FR_EXAMPLE
+    ),
+    selection: PolicyParams = Depends(policy_params),
 ):
+    """
+    Responses carry an ETag derived from the payload; resend it in
+    If-None-Match to get a 304. Results are cached per payload (LRU + TTL).
+    Scoring policy selection works as on every single-score route (see /scoring/policies).
+    With PROFILE_SECRET configured, an `X-Profile: <secret>` header scores the
+    request under cProfile (uncached) and returns the profile id in X-Profile-Id.
+    """
     try:
-        return calculate_fr_score(payload)
+        policies = _policy_selection(selection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    profile_header = request.headers.get(PROFILE_HEADER)
+    if profile_header is not None:
+        return _profiled_fr_score(payload, profile_header, policies)
+
+    # responses differ per policy selection and per weights/bands version, so
+    # both are part of the key and the ETag: a deploy or policy file that
+    # changes FR scoring invalidates clients' cached scores
+    if policies is None:
+        salt = POLICIES[PRODUCTION].fr_fingerprint
+    else:
+        salt = ",".join(f"{p.name}:{p.fr_fingerprint}" for p in policies)
+    key = payload_key(payload, salt=salt)
+    etag = f'"{key}"'
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body = FR_CACHE.get(key)
+    if body is None:
+        try:
+            with timed("score"):
+                if policies is None:
+                    result = calculate_fr_score(payload)
+                else:
+                    result = _with_policies(policies, score_fr(payload, policies))
+            with timed("serialize"):
+                body = dumps(result)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        FR_CACHE.put(key, body)
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _profiled_fr_score(
+    payload: Dict[str, Any], profile_header: str, policies: Optional[List[ScoringPolicy]]
+) -> Response:
+    # bypasses the cache and ETag check so the scoring path actually runs,
+    # under the same policy selection an unprofiled request would use
+    if not profile_authorized(profile_header):
+        raise HTTPException(status_code=403, detail="Profiling not enabled or wrong secret")
+    try:
+        with timed("score"):
+            if policies is None:
+                result, profile_id = run_profiled(calculate_fr_score, payload)
+            else:
+                results, profile_id = run_profiled(score_fr, payload, policies)
+                result = _with_policies(policies, results)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=dumps(result), media_type="application/json", headers={"X-Profile-Id": profile_id})
+
+
+@app.get("/fr/cache/stats")
+def get_fr_cache_stats():
+    return FR_CACHE.stats()
+
+
+@app.post("/fr/score/trajectory")
+def get_fr_trajectory(payload: Dict[str, Any] = Body(...)):
+    """
+    Same year -> metrics body as /fr/score, any number of years (>= 3).
+    Scores every consecutive 3-year window and lists band changes between them.
+    """
+    try:
+        with timed("score"):
+            result = calculate_fr_trajectory(payload)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
+
+
+@app.post("/fr/score/sensitivity")
+def get_fr_sensitivity(payload: FrSensitivityInput):
+    """
+    Score one FR payload under many perturbations (e.g. Net Sales -10%) in one
+    vectorized pass. Returns the base result and, per perturbation, the total
+    score, its delta from the base and the ratio bands that changed.
+    Without perturbations every input metric is tried at +/-5% and +/-10%
+    (or at `steps`).
+    """
+    perturbations = None
+    if payload.perturbations is not None:
+        perturbations = [p.dict() for p in payload.perturbations]
+    try:
+        with timed("score"):
+            result = calculate_fr_sensitivity(payload.financials, perturbations, payload.steps)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
+
+
+@app.post("/fr/score/batch")
+def get_fr_score_batch(payload: FrBatchInput):
+    try:
+        with timed("score"):
+            result = calculate_fr_scores(payloads=payload.borrowers, data=payload.data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
+
+
+@app.post("/score/full")
+def get_full_score(payload: FullScoreInput, selection: PolicyParams = Depends(policy_params)):
+    """
+    Score COA, SOA, IR and FR for one application in a single request.
+    With ?compare=<policy> both policies are scored from one pass over the inputs.
+    """
+    try:
+        with timed("score"):
+            policies = _policy_selection(selection)
+            if policies is None:
+                result = calculate_full_score(
+                    payload.coa.dict(),
+                    payload.soa.dict(),
+                    payload.ir.industry,
+                    payload.fr,
+                    weights=payload.weights
+                )
+            else:
+                result = _with_policies(policies, calculate_full_scores(
+                    payload.coa.dict(),
+                    payload.soa.dict(),
+                    payload.ir.industry,
+                    payload.fr,
+                    policies,
+                    weights=payload.weights
+                ))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result)
+
+
+@app.get("/scoring/policies")
+def get_scoring_policies():
+    """
+    Loaded scoring policy versions (SCORING_POLICIES_FILE) and the default.
+    """
+    return {
+        "default": DEFAULT_POLICY,
+        "policies": {
+            name: {
+                "coa_weights": p.coa_weights,
+                "soa_weights": p.soa_weights,
+                "fr_weights": p.fr_weights,
+                "fr_bands": {m: {"bounds": t.bounds, "scores": t.scores, "higher_is_better": t.higher_is_better}
+                             for m, t in p.fr_bands.items()},
+                "ir_factor_weight": p.ir_factor_weight,
+                "composite_weights": {**COMPOSITE_WEIGHTS, **p.composite_weights},
+                "fr_fingerprint": p.fr_fingerprint
+            }
+            for name, p in POLICIES.items()
+        }
+    }
+
+
+@app.post(
+    "/score/stream",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+        }
+    }
+)
+async def score_stream(request: Request):
+    """
+    Bulk scoring over newline-delimited JSON, streamed in both directions.
+    One record per line: {"type": "coa|soa|ir|fr", "id": ..., "payload": {...}}
+    """
+    return NDJSONStreamingResponse(score_ndjson_stream(request.stream()))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus text format. Set METRICS_MULTIPROC_DIR to aggregate across workers.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
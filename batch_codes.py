@@ -0,0 +1,82 @@
+# batch_codes.py
+# Column-wise helpers for the vectorized scorecard path (scorecard.Scorecard.score_matrix).
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def compile_lookup(score_map: Dict[int, float]) -> np.ndarray:
+    """
+    Turn a {code: score} map into an array indexed by code.
+    Codes not in the map hold NaN so they can be flagged as invalid.
+    Raises ValueError on a negative code, which would index from the end.
+    """
+    if min(score_map) < 0:
+        raise ValueError(f"Negative code {min(score_map)} in score map")
+    table = np.full(max(score_map) + 1, np.nan)
+    for code, score in score_map.items():
+        table[code] = score
+    return table
+
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _column(values: Sequence[Optional[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(values)
+    try:
+        if None not in values:
+            # the common case: one C-level conversion instead of two generator passes
+            return np.array(values, dtype=np.int64).reshape(n), np.ones(n, dtype=bool)
+        present = np.fromiter((v is not None for v in values), dtype=bool, count=n)
+        codes = np.fromiter((0 if v is None else v for v in values), dtype=np.int64, count=n)
+    except OverflowError:
+        # a code beyond int64 cannot index any table: store -1 so that row alone
+        # fails as an invalid code (see code_at for the original value)
+        return _column([v if v is None or _INT64_MIN <= v <= _INT64_MAX else -1 for v in values])
+    return codes, present
+
+
+def code_at(
+    field: str,
+    index: int,
+    rows: Optional[List[Dict[str, int]]] = None,
+    columns: Optional[Dict[str, List[Optional[int]]]] = None,
+) -> Any:
+    """
+    The code as sent for one row, for error messages (the code matrix may hold -1 instead).
+    """
+    if rows is not None:
+        return rows[index].get(field)
+    return columns[field][index]
+
+
+def to_code_matrix(
+    fields: Sequence[str],
+    rows: Optional[List[Dict[str, int]]] = None,
+    columns: Optional[Dict[str, List[Optional[int]]]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build (codes, present) arrays of shape (n_rows, n_fields) from either
+    a list of row dicts or a dict of equal-length columns.
+    """
+    if (rows is None) == (columns is None):
+        raise ValueError("Provide exactly one of 'rows' or 'columns'")
+
+    if rows is not None:
+        cols = [_column([row.get(f) for row in rows]) for f in fields]
+        n = len(rows)
+    else:
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        n = lengths.pop() if lengths else 0
+        cols = [_column(columns[f]) if f in columns else _column([None] * n) for f in fields]
+
+    codes = np.empty((n, len(fields)), dtype=np.int64)
+    present = np.empty((n, len(fields)), dtype=bool)
+    for j, (c, p) in enumerate(cols):
+        codes[:, j] = c
+        present[:, j] = p
+    return codes, present
+
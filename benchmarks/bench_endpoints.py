@@ -0,0 +1,237 @@
+# bench_endpoints.py
+# In-process load test of the HTTP layer with a mixed traffic profile.
+# Requests go straight into the ASGI app (no server, no sockets, no network).
+#
+#   python benchmarks/bench_endpoints.py                      # run and print
+#   python benchmarks/bench_endpoints.py --save-baseline      # store as the baseline
+#   python benchmarks/bench_endpoints.py --check              # exit 1 on regression
+#
+# Traffic: COA and SOA with random codes, IR cycling through every industry,
+# FR with 3- to 20-year histories. Baselines are per machine: save one before
+# the change under test, then --check after it on the same host.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inputs import INDUSTRIES, coa_codes, fr_history, soa_codes
+
+import serialization
+from app import app
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "endpoints.json")
+
+# share of requests per endpoint
+TRAFFIC_MIX = {
+    "/coa/score": 0.30,
+    "/soa/score": 0.30,
+    "/ir/score": 0.20,
+    "/fr/score": 0.20,
+}
+
+FR_YEARS = (3, 20)
+
+
+# 1. REQUESTS
+
+def build_requests(n: int, seed: int) -> List[Tuple[str, bytes]]:
+    """
+    n (path, JSON body) pairs drawn from TRAFFIC_MIX, encoded up front
+    so the client side costs nothing during the run.
+    """
+    rnd = random.Random(seed)
+    paths = rnd.choices(list(TRAFFIC_MIX), weights=list(TRAFFIC_MIX.values()), k=n)
+    industry = 0
+    out = []
+    for path in paths:
+        if path == "/coa/score":
+            body: Any = coa_codes(rnd)
+        elif path == "/soa/score":
+            body = soa_codes(rnd)
+        elif path == "/ir/score":
+            body = {"industry": INDUSTRIES[industry % len(INDUSTRIES)]}
+            industry += 1
+        else:
+            body = fr_history(rnd, rnd.randint(*FR_YEARS))
+        out.append((path, json.dumps(body).encode()))
+    return out
+
+
+async def call(path: str, body: bytes) -> int:
+    """
+    One POST through the ASGI app. Returns the status code.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    done = asyncio.Event()
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+# 2. RUN
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+async def run(requests: List[Tuple[str, bytes]], concurrency: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {path: [] for path in TRAFFIC_MIX}
+    failures: Dict[str, int] = {path: 0 for path in TRAFFIC_MIX}
+    queue = iter(requests)
+
+    async def worker():
+        for path, body in queue:
+            start = time.perf_counter()
+            status = await call(path, body)
+            latencies[path].append(time.perf_counter() - start)
+            if status != 200:
+                failures[path] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    endpoints = {}
+    for path, values in latencies.items():
+        values.sort()
+        endpoints[path] = {
+            "requests": len(values),
+            "failures": failures[path],
+            "throughput_rps": len(values) / wall,
+            "p50_ms": percentile(values, 50) * 1e3,
+            "p95_ms": percentile(values, 95) * 1e3,
+            "p99_ms": percentile(values, 99) * 1e3,
+        }
+    return {"total_requests": len(requests), "wall_seconds": wall,
+            "throughput_rps": len(requests) / wall, "endpoints": endpoints}
+
+
+async def warm_up(seed: int, n: int = 200) -> None:
+    for path, body in build_requests(n, seed + 1):
+        await call(path, body)
+
+
+# 3. BASELINES
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions beyond `tolerance` (0.25 = 25%): higher p50/p95/p99 latency
+    or lower throughput than the baseline, per endpoint.
+    """
+    problems = []
+    for path, base in baseline["endpoints"].items():
+        cur = result["endpoints"].get(path)
+        if cur is None:
+            problems.append(f"{path}: missing from this run")
+            continue
+        if cur["failures"]:
+            problems.append(f"{path}: {cur['failures']} non-200 responses")
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[key] > 0 and cur[key] > base[key] * (1 + tolerance):
+                problems.append(f"{path}: {key} {cur[key]:.3f} vs baseline {base[key]:.3f}")
+        if cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{path}: throughput {cur['throughput_rps']:.0f} rps "
+                            f"vs baseline {base['throughput_rps']:.0f} rps")
+    return problems
+
+
+def report(result: Dict[str, Any]) -> None:
+    print(f"{result['total_requests']} requests in {result['wall_seconds']:.2f}s, "
+          f"{result['throughput_rps']:,.0f} req/s (json backend: {serialization.BACKEND})")
+    print(f"  {'endpoint':<14} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fail':>5}")
+    for path, r in result["endpoints"].items():
+        print(f"  {path:<14} {r['requests']:>9} {r['throughput_rps']:>9,.0f} {r['p50_ms']:>9.3f} "
+              f"{r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['failures']:>5}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Mixed-traffic endpoint benchmark against the in-process ASGI app.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--check", action="store_true", help="compare with --baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    requests = build_requests(args.requests, args.seed)
+    asyncio.run(warm_up(args.seed))
+    result = asyncio.run(run(requests, args.concurrency))
+    result["config"] = {
+        "requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+        "traffic_mix": TRAFFIC_MIX, "fr_years": list(FR_YEARS),
+        "python": platform.python_version(), "machine": platform.machine(),
+        "json_backend": serialization.BACKEND,
+    }
+    report(result)
+
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {path}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            raise SystemExit(f"no baseline at {args.baseline}; run with --save-baseline first")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(result, baseline, args.tolerance)
+        if problems:
+            print(f"\nREGRESSION (tolerance {args.tolerance:.0%}):")
+            for p in problems:
+                print(f"  {p}")
+            sys.exit(1)
+        print(f"\nno regression vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# bench_scorecards.py
+# Compiled scorecards vs the hand-written scorers they replaced.
+#
+#   python benchmarks/bench_scorecards.py [--number 200000] [--batch 1000] [--min-speedup 1.0]
+#
+# The hand-written versions below are the COA loop, the unrolled SOA lookups
+# and the bisect-based FR get_score as they were before scorecard.py; the
+# "score table" cases compare the compiled COA/SOA cards with their
+# precomputed ScoreSpace. Every case first checks that both sides return
+# identical results, then times them.
+import argparse
+import itertools
+import os
+import random
+import sys
+import timeit
+from bisect import bisect_left, bisect_right
+from itertools import cycle
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coa_logic
+import soa_logic
+from batch_codes import compile_lookup, to_code_matrix
+from fr_logic import BANDS, FR_SCORECARD, RATIO_NAMES, get_score
+
+
+# 1. HAND-WRITTEN REFERENCE SCORERS
+
+def handwritten_coa(input_codes: dict) -> int:
+    total_score = 0
+    for field, weight in coa_logic.WEIGHTS.items():
+        if field not in input_codes:
+            raise ValueError(f"Missing field: {field}")
+        code = input_codes[field]
+        if code not in coa_logic.SCORE_MAP[field]:
+            raise ValueError(f"Invalid code {code} for {field}")
+        total_score += coa_logic.SCORE_MAP[field][code] * weight
+    return round(total_score)
+
+
+def handwritten_soa(inputs: dict) -> float:
+    w = soa_logic.WEIGHTS
+    total = 0
+    total += soa_logic.YEAR_IN_BUSINESS_SCORE[inputs["year_in_business"]] * w["year_in_business"]
+    total += soa_logic.LOCATION_SCORE[inputs["location"]] * w["location"]
+    total += soa_logic.RELATIONSHIP_AGE_SCORE[inputs["relationship_age"]] * w["relationship_age"]
+    total += soa_logic.AUDITOR_QUALITY_SCORE[inputs["auditor_quality"]] * w["auditor_quality"]
+    total += soa_logic.AUDITOR_OPINION_SCORE[inputs["auditor_opinion"]] * w["auditor_opinion"]
+    total += soa_logic.NATIONALIZATION_SCORE[inputs["nationalization"]] * w["nationalization"]
+    return round(total, 1)
+
+
+def handwritten_get_score(metric: str, value: float) -> int:
+    table = BANDS.get(metric)
+    if table is None or value != value:
+        return 0
+    if table.higher_is_better:
+        return table.scores[bisect_right(table.bounds, value)]
+    return table.scores[bisect_left(table.bounds, value)]
+
+
+def handwritten_code_batch(columns: dict, score_map: dict, weights: dict, digits: int) -> list:
+    # the numpy batch path before scorecard.py (batch_codes.score_code_matrix)
+    fields = list(weights)
+    codes, present = to_code_matrix(fields, columns=columns)
+    total = np.zeros(codes.shape[0])
+    ok = np.ones(codes.shape[0], dtype=bool)
+    for j, field in enumerate(fields):
+        table = compile_lookup(score_map[field])
+        col = codes[:, j]
+        in_range = present[:, j] & (col >= 0) & (col < len(table))
+        raw = table[np.where(in_range, col, 0)]
+        ok &= in_range & ~np.isnan(raw)
+        total += raw * weights[field]
+    if digits == 0:
+        return [int(t) if v else None for t, v in zip(np.rint(total).tolist(), ok.tolist())]
+    return [round(t, digits) if v else None for t, v in zip(total.tolist(), ok.tolist())]
+
+
+_FR_SEARCHSORTED = {
+    metric: (np.array(t.bounds), np.array(t.scores), "right" if t.higher_is_better else "left")
+    for metric, t in BANDS.items()
+}
+
+
+def handwritten_fr_columns(columns: dict) -> list:
+    # fr_portfolio's own searchsorted and total loop before it used the FR card
+    total = np.zeros(len(columns[RATIO_NAMES[0]]))
+    for f in FR_SCORECARD.fields:
+        values = np.array(columns[f.name], dtype=float)
+        bounds, scores, side = _FR_SEARCHSORTED[f.name]
+        points = np.where(np.isnan(values), 0, scores[np.searchsorted(bounds, values, side=side)])
+        total += points * f.weight
+    return [round(t, 3) for t in total.tolist()]
+
+
+# 2. CASES
+
+def _all_codes(score_map):
+    return [dict(zip(score_map, combo)) for combo in itertools.product(*(sorted(m) for m in score_map.values()))]
+
+
+def cases(batch: int, seed: int):
+    rnd = random.Random(seed)
+    coa_rows = _all_codes(coa_logic.SCORE_MAP)
+    soa_rows = _all_codes(soa_logic._FIELD_SCORES)
+
+    # ratio values spread over every band, plus exact bounds and NaN
+    fr_values = []
+    for metric in RATIO_NAMES:
+        bounds = BANDS[metric].bounds
+        lo, hi = bounds[0] - 1, bounds[-1] + 1
+        fr_values += [(metric, rnd.uniform(lo, hi)) for _ in range(200)]
+        fr_values += [(metric, b) for b in bounds] + [(metric, float("nan"))]
+    fr_rows = [
+        {metric: rnd.uniform(BANDS[metric].bounds[0] - 1, BANDS[metric].bounds[-1] + 1) for metric in RATIO_NAMES}
+        for _ in range(batch)
+    ]
+    fr_columns = {metric: [row[metric] for row in fr_rows] for metric in RATIO_NAMES}
+
+    coa_batch = [coa_rows[rnd.randrange(len(coa_rows))] for _ in range(batch)]
+    soa_batch = [soa_rows[rnd.randrange(len(soa_rows))] for _ in range(batch)]
+    coa_columns = {f: [row[f] for row in coa_batch] for f in coa_logic.WEIGHTS}
+    soa_columns = {f: [row[f] for row in soa_batch] for f in soa_logic.WEIGHTS}
+
+    def fr_loop(rows):
+        return [round(sum(handwritten_get_score(m, row[m]) * FR_SCORECARD.fields[i].weight
+                          for i, m in enumerate(RATIO_NAMES)), 3) for row in rows]
+
+    # (name, hand-written, compiled, inputs, rows per call)
+    return [
+        ("coa score", handwritten_coa, coa_logic.calculate_coa_score, coa_rows, 1),
+        ("soa score", handwritten_soa, soa_logic.calculate_soa_score, soa_rows, 1),
+        ("fr get_score", lambda a: handwritten_get_score(*a), lambda a: get_score(*a), fr_values, 1),
+        (f"coa batch[{batch}] scalar loop vs score_batch",
+         lambda rows: [handwritten_coa(r) for r in rows],
+         lambda rows: coa_logic.COA_SCORECARD.score_batch(rows=rows)[0], [coa_batch], batch),
+        (f"soa batch[{batch}] scalar loop vs score_batch",
+         lambda rows: [handwritten_soa(r) for r in rows],
+         lambda rows: soa_logic.SOA_SCORECARD.score_batch(rows=rows)[0], [soa_batch], batch),
+        (f"coa columns[{batch}] numpy loop vs score_batch",
+         lambda cols: handwritten_code_batch(cols, coa_logic.SCORE_MAP, coa_logic.WEIGHTS, 0),
+         lambda cols: coa_logic.COA_SCORECARD.score_batch(columns=cols)[0], [coa_columns], batch),
+        (f"soa columns[{batch}] numpy loop vs score_batch",
+         lambda cols: handwritten_code_batch(cols, soa_logic._FIELD_SCORES, soa_logic.WEIGHTS, 1),
+         lambda cols: soa_logic.SOA_SCORECARD.score_batch(columns=cols)[0], [soa_columns], batch),
+        ("coa score compiled card vs score table", coa_logic.COA_SCORECARD.score, coa_logic.COA_SPACE.score, coa_rows, 1),
+        ("soa score compiled card vs score table", soa_logic.SOA_SCORECARD.score, soa_logic.SOA_SPACE.score, soa_rows, 1),
+        (f"coa batch[{batch}] compiled card vs score table",
+         lambda rows: coa_logic.COA_SCORECARD.score_batch(rows=rows),
+         lambda rows: coa_logic.COA_SPACE.score_batch(rows=rows), [coa_batch], batch),
+        (f"soa batch[{batch}] compiled card vs score table",
+         lambda rows: soa_logic.SOA_SCORECARD.score_batch(rows=rows),
+         lambda rows: soa_logic.SOA_SPACE.score_batch(rows=rows), [soa_batch], batch),
+        (f"fr total[{batch}] get_score loop vs compiled score",
+         fr_loop, lambda rows: [FR_SCORECARD.score(r) for r in rows], [fr_rows], batch),
+        (f"fr total[{batch}] searchsorted vs score_batch",
+         handwritten_fr_columns, lambda cols: FR_SCORECARD.score_batch(columns=cols)[0], [fr_columns], batch),
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compiled scorecards vs hand-written scorers.")
+    parser.add_argument("--number", type=int, default=200000, help="calls per timing run (scalar cases)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-speedup", type=float, default=None,
+                        help="exit 1 if any case is slower than this ratio")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<50} {'hand-written':>14} {'compiled':>12} {'speedup':>8}")
+    failed = False
+    for name, before, after, inputs, rows in cases(args.batch, args.seed):
+        mismatches = sum(before(x) != after(x) for x in inputs)
+        if mismatches:
+            print(f"{name}: {mismatches} of {len(inputs)} results differ")
+            failed = True
+            continue
+
+        number = max(1, args.number // rows)
+        timings = []
+        for fn in (before, after):
+            it = cycle(inputs)
+            best = min(timeit.repeat(lambda: fn(next(it)), number=number, repeat=args.repeat))
+            timings.append(best / number / rows * 1e9)
+        speedup = timings[0] / timings[1]
+        print(f"{name:<50} {timings[0]:>11,.0f} ns {timings[1]:>9,.0f} ns {speedup:>7.2f}x")
+        if args.min_speedup is not None and speedup < args.min_speedup:
+            print(f"{name}: below --min-speedup {args.min_speedup}")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# bench_scoring.py
+# Micro-benchmarks of the pure scoring functions, without FastAPI.
+# Compare with bench_endpoints.py to tell a slower scoring core from a slower HTTP layer.
+#
+#   python benchmarks/bench_scoring.py [--only fr] [--batch 1000] [--output scoring.json]
+#
+# ns/op     best of --repeat timing runs, per call (per row for batch cases)
+# peak B    peak traced memory of one call, per row for batch cases (tracemalloc)
+# kept B    memory still held after that call returned (caches, leaks)
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+from itertools import cycle
+from typing import Any, Callable, Dict, List, NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inputs import INDUSTRIES, coa_batch, coa_codes, fr_batch, fr_history, soa_batch, soa_codes
+
+import numpy as np
+
+from coa_logic import calculate_coa_score, calculate_coa_scores
+from soa_logic import calculate_soa_score, calculate_soa_scores
+from ir_model import calculate_ir, compile_ir_table, generate_matrix
+from industry_data import INDUSTRY_DATA
+from fr_logic import APARFinancialModel, INPUT_METRICS, RATIO_NAMES, calculate_fr_score, get_score
+from fr_portfolio import calculate_fr_scores, score_values, year_ratios
+from fr_sensitivity import DEFAULT_STEPS, calculate_fr_sensitivity
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable[[], Any]  # one operation; cycles through its inputs on every call
+    rows: int = 1          # rows scored per operation (batch cases)
+
+
+# 1. CASES
+
+def _cycling(fn: Callable[[Any], Any], inputs: List[Any]) -> Callable[[], Any]:
+    it = cycle(inputs)
+    return lambda: fn(next(it))
+
+
+def build_cases(seed: int, batch: int) -> List[Case]:
+    rnd = random.Random(seed)
+    pool = 256  # distinct inputs cycled by the scalar cases
+
+    coa = [coa_codes(rnd) for _ in range(pool)]
+    soa = [soa_codes(rnd) for _ in range(pool)]
+    histories = [fr_history(rnd, 3) for _ in range(pool)]
+    # (history, year, prev_sales) for the middle year of each history
+    years = [(h, sorted(h)[1], h[sorted(h)[0]]["Net Sales"]) for h in histories]
+    ratio_values = [
+        (metric, model.calculate_single_year(year, prev)[metric])
+        for model, year, prev in ((APARFinancialModel(h), y, p) for h, y, p in years)
+        for metric in RATIO_NAMES
+    ]
+
+    coa_cols = coa_batch(rnd, batch)
+    soa_cols = soa_batch(rnd, batch)
+    fr_payloads = fr_batch(rnd, batch)
+    fin = np.array([[h[sorted(h)[1]][m] for m in INPUT_METRICS] for h in fr_payloads])
+    prev_sales = np.array([h[sorted(h)[0]]["Net Sales"] for h in fr_payloads])
+    values_by_metric = {m: np.array([v for name, v in ratio_values if name == m]) for m in RATIO_NAMES}
+    values_by_metric = {m: np.resize(v, batch) for m, v in values_by_metric.items()}
+
+    warm_model = APARFinancialModel(histories[0])
+    warm_year, warm_prev = sorted(histories[0])[1], histories[0][sorted(histories[0])[0]]["Net Sales"]
+
+    return [
+        Case("coa  calculate_coa_score", _cycling(calculate_coa_score, coa)),
+        Case(f"coa  calculate_coa_scores[{batch}]", lambda: calculate_coa_scores(columns=coa_cols), batch),
+        Case("soa  calculate_soa_score", _cycling(calculate_soa_score, soa)),
+        Case(f"soa  calculate_soa_scores[{batch}]", lambda: calculate_soa_scores(columns=soa_cols), batch),
+        Case("ir   calculate_ir", _cycling(calculate_ir, INDUSTRIES)),
+        Case(f"ir   compile_ir_table[{len(INDUSTRY_DATA)}]",
+             lambda: compile_ir_table(INDUSTRY_DATA), len(INDUSTRY_DATA)),
+        Case("ir   generate_matrix", generate_matrix),
+        Case("fr   calculate_single_year (new model)",
+             _cycling(lambda a: APARFinancialModel(a[0]).calculate_single_year(a[1], a[2]), years)),
+        Case("fr   calculate_single_year (memoized)",
+             lambda: warm_model.calculate_single_year(warm_year, warm_prev)),
+        Case(f"fr   year_ratios[{batch}]", lambda: year_ratios(fin, prev_sales), batch),
+        Case("fr   get_score", _cycling(lambda a: get_score(*a), ratio_values)),
+        Case(f"fr   score_values[{batch}] x8",
+             lambda: [score_values(m, v) for m, v in values_by_metric.items()], batch * len(RATIO_NAMES)),
+        Case("fr   calculate_fr_score", _cycling(calculate_fr_score, histories)),
+        Case(f"fr   calculate_fr_scores[{batch}]", lambda: calculate_fr_scores(payloads=fr_payloads), batch),
+        Case(f"fr   calculate_fr_sensitivity[{len(INPUT_METRICS) * len(DEFAULT_STEPS)}]",
+             _cycling(calculate_fr_sensitivity, histories), len(INPUT_METRICS) * len(DEFAULT_STEPS)),
+    ]
+
+
+# 2. MEASUREMENT
+
+def measure(case: Case, repeat: int, min_time: float) -> Dict[str, Any]:
+    timer = timeit.Timer(case.fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    case.fn()  # settle lazy caches before tracing
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        case.fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": case.name,
+        "rows": case.rows,
+        "ns_per_op": best * 1e9 / case.rows,
+        "ops_per_s": case.rows / best,
+        "peak_bytes_per_op": (peak - before) / case.rows,
+        "retained_bytes": after - before,
+        "loops": number,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark the scoring functions (no HTTP).")
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per batch case")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to a JSON file")
+    args = parser.parse_args(argv)
+
+    cases = [c for c in build_cases(args.seed, args.batch) if not args.only or args.only in c.name]
+    print(f"{'case':<42} {'ns/op':>12} {'ops/s':>14} {'peak B/op':>11} {'kept B':>8}")
+    results = []
+    for case in cases:
+        r = measure(case, args.repeat, args.min_time)
+        results.append(r)
+        print(f"{r['name']:<42} {r['ns_per_op']:>12,.0f} {r['ops_per_s']:>14,.0f} "
+              f"{r['peak_bytes_per_op']:>11,.0f} {r['retained_bytes']:>8,}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"seed": args.seed, "batch": args.batch, "results": results}, f, indent=2)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
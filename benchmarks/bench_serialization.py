@@ -0,0 +1,71 @@
+# bench_serialization.py
+# Per-response JSON encoding cost: FastAPI's default path vs serialization.dumps.
+#
+#   python benchmarks/bench_serialization.py [--number 20000]
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+import serialization
+from app import FR_EXAMPLE
+from coa_logic import SCORE_MAP, calculate_coa_scores
+from fr_logic import calculate_fr_score, calculate_fr_trajectory
+from ir_model import calculate_ir
+from industry_data import INDUSTRY_DATA
+
+
+def _long_history(years: int):
+    base = list(FR_EXAMPLE.values())
+    return {str(2000 + i): dict(base[i % len(base)]) for i in range(years)}
+
+
+def payloads():
+    industry = next(iter(INDUSTRY_DATA))
+    codes = {f: [min(SCORE_MAP[f])] * 1000 for f in SCORE_MAP}
+    return {
+        "fr/score": calculate_fr_score(FR_EXAMPLE),
+        "fr/score/trajectory (15y)": calculate_fr_trajectory(_long_history(15)),
+        "ir breakdown": calculate_ir(industry),
+        "coa/score/batch (1000)": calculate_coa_scores(columns=codes),
+    }
+
+
+def encoders():
+    render = JSONResponse(None).render
+    out = {
+        "fastapi default": lambda c: render(jsonable_encoder(c)),
+        "stdlib json": serialization._stdlib_dumps,
+    }
+    if serialization.orjson is not None:
+        out["orjson"] = lambda c: serialization.orjson.dumps(c, option=serialization.orjson.OPT_SERIALIZE_NUMPY)
+    if serialization.msgspec is not None:
+        out["msgspec"] = serialization.msgspec.json.Encoder().encode
+    return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON encoders on scoring responses.")
+    parser.add_argument("--number", type=int, default=20000, help="encodes per measurement")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"active backend: {serialization.BACKEND}")
+    for name, content in payloads().items():
+        size = len(serialization.dumps(content))
+        print(f"\n{name} ({size} bytes)")
+        baseline = None
+        for enc_name, encode in encoders().items():
+            best = min(timeit.repeat(lambda: encode(content), number=args.number, repeat=args.repeat))
+            us = best / args.number * 1e6
+            baseline = baseline or us
+            print(f"  {enc_name:<16} {us:9.2f} us/response  saves {baseline - us:8.2f} us ({baseline / us:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
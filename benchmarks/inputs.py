@@ -0,0 +1,55 @@
+# inputs.py
+# Deterministic benchmark inputs built from INDUSTRY_DATA, the COA/SOA code
+# tables and the FR example payload in app.py. Same seed, same inputs.
+import os
+import random
+import sys
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import FR_EXAMPLE
+from coa_logic import SCORE_MAP as COA_SCORE_MAP
+from industry_data import INDUSTRY_DATA
+from soa_logic import _FIELD_SCORES as SOA_SCORE_MAP
+
+
+INDUSTRIES: List[str] = sorted(INDUSTRY_DATA)
+
+# the example's years, oldest first, used as templates for longer histories
+_FR_TEMPLATES = [FR_EXAMPLE[y] for y in sorted(FR_EXAMPLE)]
+
+
+def coa_codes(rnd: random.Random) -> Dict[str, int]:
+    return {field: rnd.choice(sorted(scores)) for field, scores in COA_SCORE_MAP.items()}
+
+
+def soa_codes(rnd: random.Random) -> Dict[str, int]:
+    return {field: rnd.choice(sorted(scores)) for field, scores in SOA_SCORE_MAP.items()}
+
+
+def fr_history(rnd: random.Random, years: int = 3, first_year: int = 2000) -> Dict[str, Dict[str, float]]:
+    """
+    `years` consecutive years of statements: the example payload's figures
+    cycled and scaled by 0.5x-2x so ratios land in different bands.
+    """
+    history = {}
+    for i in range(years):
+        template = _FR_TEMPLATES[i % len(_FR_TEMPLATES)]
+        history[str(first_year + i)] = {k: round(v * rnd.uniform(0.5, 2.0), 1) for k, v in template.items()}
+    return history
+
+
+def coa_batch(rnd: random.Random, n: int) -> Dict[str, List[int]]:
+    """
+    n borrowers in the column layout of calculate_coa_scores.
+    """
+    return {field: [rnd.choice(sorted(scores)) for _ in range(n)] for field, scores in COA_SCORE_MAP.items()}
+
+
+def soa_batch(rnd: random.Random, n: int) -> Dict[str, List[int]]:
+    return {field: [rnd.choice(sorted(scores)) for _ in range(n)] for field, scores in SOA_SCORE_MAP.items()}
+
+
+def fr_batch(rnd: random.Random, n: int, years: int = 3) -> List[Dict[str, Any]]:
+    return [fr_history(rnd, years) for _ in range(n)]
@@ -1,4 +1,7 @@
 # coa_logic.py
+from typing import Any, Dict, List, Optional
+
+from scorecard import ScoreSpace, compile_scorecard
 
 WEIGHTS = {
     "bounce_cheques": 0.20,
@@ -46,19 +49,32 @@ SCORE_MAP = {
     }
 }
 
-def calculate_coa_score(input_codes: dict) -> int:
-    total_score = 0
+# ---------- scorecard ----------
+
+COA_SCORECARD = compile_scorecard({
+    "name": "coa",
+    "round": 0,
+    "fields": {field: {"weight": weight, "points": SCORE_MAP[field]} for field, weight in WEIGHTS.items()}
+})
 
-    for field, weight in WEIGHTS.items():
-        if field not in input_codes:
-            raise ValueError(f"Missing field: {field}")
+# every input combination scored once at import, indexed by mixed-radix code
+COA_SPACE = ScoreSpace(COA_SCORECARD)
 
-        code = input_codes[field]
+# calculate_coa_score(input_codes: dict) -> int
+# Weighted points rounded to an int; ValueError on a missing field or unknown code.
+calculate_coa_score = COA_SPACE.score
 
-        if code not in SCORE_MAP[field]:
-            raise ValueError(f"Invalid code {code} for {field}")
 
-        raw_score = SCORE_MAP[field][code]
-        total_score += raw_score * weight
+# ---------- batch scoring ----------
 
-    return round(total_score)
+def calculate_coa_scores(
+    rows: Optional[List[Dict[str, int]]] = None,
+    columns: Optional[Dict[str, List[Optional[int]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Score many borrowers at once from row dicts or columnar code arrays.
+    Invalid rows get a None score and an entry in "errors"; the rest of the
+    batch is still scored. Scores match calculate_coa_score exactly.
+    """
+    scores, errors = COA_SPACE.score_batch(rows=rows, columns=columns)
+    return {"coa_scores": scores, "errors": errors}
@@ -0,0 +1,95 @@
+# composite_logic.py
+# Scores COA, SOA, IR and FR for one application in a single pass.
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from scoring_policy import PRODUCTION, ScoringPolicy, get_policy, score_coa, score_fr, score_ir, score_soa
+
+
+# default inter-score weights (normalized to sum to 1 before use)
+COMPOSITE_WEIGHTS = {
+    "coa": 0.25,
+    "soa": 0.25,
+    "ir": 0.25,
+    "fr": 0.25
+}
+
+
+def _resolve_weights(weights: Optional[Dict[str, float]], base: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    merged = {**COMPOSITE_WEIGHTS, **(base or {})}
+    if weights:
+        unknown = set(weights) - set(COMPOSITE_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown composite weight(s): {', '.join(sorted(unknown))}")
+        merged.update(weights)
+
+    if any(w < 0 for w in merged.values()):
+        raise ValueError("Composite weights must be non-negative")
+    total = sum(merged.values())
+    if total <= 0:
+        raise ValueError("Composite weights must not all be zero")
+    return {k: w / total for k, w in merged.items()}
+
+
+def calculate_full_scores(
+    coa_inputs: Dict[str, int],
+    soa_inputs: Dict[str, int],
+    industry: str,
+    fr_inputs: Dict[str, Dict[str, float]],
+    policies: Sequence[ScoringPolicy],
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    calculate_full_score under each policy, in one pass over the inputs:
+    lookups and ratios are shared, only weights and bands differ per policy.
+    `weights` overrides every policy's composite weights.
+    Timings cover all policies together.
+    """
+    blends = [_resolve_weights(weights, p.composite_weights) for p in policies]
+
+    steps = (
+        ("coa", lambda: score_coa(coa_inputs, policies)),
+        ("soa", lambda: score_soa(soa_inputs, policies)),
+        ("ir", lambda: score_ir(industry, policies)),
+        ("fr", lambda: [r["total_score"] for r in score_fr(fr_inputs, policies)]),
+    )
+
+    scores: Dict[str, List[float]] = {}
+    timings: Dict[str, float] = {}
+    for name, run in steps:
+        start = perf_counter()
+        try:
+            scores[name] = run()
+        except Exception as e:
+            raise ValueError(f"{name}: {e}") from e
+        timings[name] = round((perf_counter() - start) * 1000, 3)
+
+    results = []
+    for i, blend in enumerate(blends):
+        composite = sum(scores[k][i] * w for k, w in blend.items())
+        results.append({
+            "composite_score": round(composite, 3),
+            "coa_score": scores["coa"][i],
+            "soa_score": scores["soa"][i],
+            "ir_score": scores["ir"][i],
+            "fr_score": scores["fr"][i],
+            "weights": {k: round(w, 6) for k, w in blend.items()},
+            "timings_ms": timings
+        })
+    return results
+
+
+def calculate_full_score(
+    coa_inputs: Dict[str, int],
+    soa_inputs: Dict[str, int],
+    industry: str,
+    fr_inputs: Dict[str, Dict[str, float]],
+    weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Run all four scorecards and blend them with the (normalized) weights.
+    Errors are re-raised as ValueError prefixed with the failing component.
+    """
+    return calculate_full_scores(
+        coa_inputs, soa_inputs, industry, fr_inputs, [get_policy(PRODUCTION)], weights
+    )[0]
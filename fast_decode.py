@@ -0,0 +1,157 @@
+# fast_decode.py
+# Request decoding for flat models of bounded integer codes (CoaInput, SoaInput).
+#
+# Well-formed bodies (every field a plain int inside its ge/le range) are
+# checked straight from the parsed JSON without building a Pydantic model.
+# Anything else is parsed again with the stdlib, as FastAPI does, and handed
+# to the model itself, so what is accepted, the coercion rules and the error
+# responses stay exactly what FastAPI would produce.
+import email.message
+import inspect
+import json
+from typing import Any, Dict, Optional, Tuple, Type
+
+from fastapi import FastAPI, HTTPException
+from fastapi.routing import APIRoute
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from serialization import loads
+
+
+# newer FastAPI versions only parse bodies without a Content-Type as JSON when
+# the route is not strict (strict is the default there)
+_STRICT_PARAM = inspect.signature(APIRoute.__init__).parameters.get("strict_content_type")
+STRICT_CONTENT_TYPE = bool(getattr(getattr(_STRICT_PARAM, "default", None), "value", False))
+
+
+def is_json_content_type(content_type: Optional[str]) -> bool:
+    """
+    Whether FastAPI would parse a body with this Content-Type as JSON.
+    """
+    if not content_type:
+        return not STRICT_CONTENT_TYPE
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+
+def _model_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    if hasattr(model, "model_json_schema"):  # pydantic v2
+        return model.model_json_schema()
+    return model.schema()
+
+
+def openapi_body(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    openapi_extra that documents `model` as the JSON request body,
+    for routes that read the raw body themselves.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}}}
+        },
+        "responses": {
+            "422": {
+                "description": "Validation Error",
+                "content": {"application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}}}
+            }
+        }
+    }
+
+
+def register_openapi_models(app: FastAPI, *models: Type[BaseModel]) -> None:
+    """
+    Make sure models referenced only through openapi_body() are listed under
+    components/schemas, as they would be for a normal body parameter.
+    """
+    generate = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            schema = generate()
+            components = schema.setdefault("components", {}).setdefault("schemas", {})
+            for model in models:
+                components.setdefault(model.__name__, _model_schema(model))
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+class CodeDecoder:
+    """
+    Precompiled validator for one model: (field, minimum, maximum) per field.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        schema = _model_schema(model)
+        self.fields: Tuple[Tuple[str, int, int], ...] = tuple(
+            (name, prop["minimum"], prop["maximum"])
+            for name, prop in schema["properties"].items()
+        )
+
+    def decode(self, body: bytes, content_type: Optional[str] = None) -> Dict[str, int]:
+        """
+        Parse and validate a raw JSON body into {field: code}.
+        Raises RequestValidationError (422) exactly like a model parameter would.
+        """
+        if not body:
+            raise RequestValidationError([
+                {"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}
+            ])
+        if not is_json_content_type(content_type):
+            # FastAPI validates such a body as raw bytes
+            return self._validate_with_model(body)
+        try:
+            data = loads(body)
+        except Exception:
+            data = None
+
+        if type(data) is dict:
+            codes = {}
+            for name, lo, hi in self.fields:
+                value = data.get(name)
+                if type(value) is not int or not lo <= value <= hi:
+                    break
+                codes[name] = value
+            else:
+                return codes
+
+        # the fast parser differs from the stdlib FastAPI uses on a few inputs
+        # (a UTF-8 BOM, NaN, integers beyond 64 bits become floats), so the
+        # slow path starts again from the raw body
+        data = self._parse_stdlib(body)
+        if data is None:
+            # FastAPI treats a JSON null body as a missing body
+            raise RequestValidationError([
+                {"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}
+            ])
+        return self._validate_with_model(data)
+
+    @staticmethod
+    def _parse_stdlib(body: bytes) -> Any:
+        # same parser and the same errors as FastAPI's own body handling
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError([
+                {"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error",
+                 "input": {}, "ctx": {"error": e.msg}}
+            ])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail="There was an error parsing the body") from e
+
+    def _validate_with_model(self, data: Any) -> Dict[str, int]:
+        try:
+            if hasattr(self.model, "model_validate"):  # pydantic v2
+                # from_attributes matches how FastAPI validates body models
+                return self.model.model_validate(data, from_attributes=True).model_dump()
+            return self.model.parse_obj(data).dict()
+        except ValidationError as e:
+            errors = e.errors(include_url=False) if hasattr(self.model, "model_validate") else e.errors()
+            raise RequestValidationError([{**err, "loc": ("body",) + tuple(err["loc"])} for err in errors])
@@ -0,0 +1,105 @@
+# fr_cache.py
+# Bounded LRU + TTL cache of serialized FR responses, keyed by payload content.
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _normalize(value: Any) -> Any:
+    # 100, 100.0 and -0.0/0.0 score identically, so they must hash identically
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = float(value)
+        return 0.0 if value == 0 else value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def payload_key(payload: Any, salt: str = "") -> str:
+    """
+    Canonical content hash of an FR payload: years and metrics sorted,
+    numbers normalized to floats. `salt` separates otherwise equal payloads
+    that are scored differently.
+    """
+    canonical = json.dumps(_normalize(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256((salt + canonical).encode()).hexdigest()
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header value matches etag (weak comparison).
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+    Counters: hits, misses, evictions (LRU), expirations (TTL).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -1,8 +1,31 @@
 # fr_logic.py
-from typing import Dict, Any
-
-
-# 1. WEIGHTS & SCORING RULES 
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from scorecard import compile_scorecard
+
+
+# 1. INPUTS, WEIGHTS & SCORING RULES 
+
+# the 16 line items expected for every year, in array column order
+INPUT_METRICS = (
+    "Net Sales",
+    "COGS",
+    "Total Liabilities",
+    "EBITDA",
+    "EBIT",
+    "Current Assets",
+    "Current Liabilities",
+    "Interest Payments",
+    "Debt Service",
+    "Trade and other receivables",
+    "Trade Creditors",
+    "Shareholders Equity",
+    "Intangible assets",
+    "Operating Cash flows",
+    "Net Profit",
+    "Inventory"
+)
 
 WEIGHTS = {
     "Net Profit Margin": 0.15,
@@ -15,6 +38,7 @@ WEIGHTS = {
     "Leverage (Debt / Tangible Net Worth)": 0.10
 }
 
+# higher is better: first (threshold, score) with value >= threshold, else 0
 RULES = {
     "Net Profit Margin": [
         (0.15, 600), (0.12, 500), (0.10, 400),
@@ -43,16 +67,88 @@ RULES = {
 }
 
 
+# lower is better: first (bound, score) with value <= bound, else 0
+LOWER_IS_BETTER_RULES = {
+    "Cash Conversion Cycle": [
+        (30.01, 600), (60.01, 300)
+    ],
+    "Leverage (Debt / Tangible Net Worth)": [
+        (1.00, 500), (1.70, 400), (2.50, 300),
+        (3.00, 200), (3.50, 100)
+    ]
+}
+
+
+class BandTable(NamedTuple):
+    bounds: Tuple[float, ...]   # ascending, inclusive
+    scores: Tuple[int, ...]     # len(bounds) + 1, indexed by band_index()
+    higher_is_better: bool
+
+
+def compile_bands(rules: List[Tuple[float, int]], higher_is_better: bool) -> BandTable:
+    """
+    Turn a (bound, score) list into a BandTable for binary search.
+    """
+    ordered = sorted(rules)
+    bounds = tuple(b for b, _ in ordered)
+    if higher_is_better:
+        scores = (0,) + tuple(s for _, s in ordered)
+    else:
+        scores = tuple(s for _, s in ordered) + (0,)
+    return BandTable(bounds, scores, higher_is_better)
+
+
+BANDS: Dict[str, BandTable] = {
+    **{m: compile_bands(r, True) for m, r in RULES.items()},
+    **{m: compile_bands(r, False) for m, r in LOWER_IS_BETTER_RULES.items()},
+}
+
+
+# the same bands and weights as a scorecard: get_score uses its compiled
+# if/elif ladders, one function per metric
+FR_SCORECARD = compile_scorecard({
+    "name": "fr",
+    "round": 3,
+    "fields": {
+        metric: {
+            "weight": weight,
+            "bands": RULES.get(metric) or LOWER_IS_BETTER_RULES[metric],
+            "higher_is_better": metric in RULES
+        }
+        for metric, weight in WEIGHTS.items()
+    }
+})
+_BAND_SCORERS = FR_SCORECARD.band_functions
+
+
 # 2. CORE FR ENGINE 
 
 
+# ratio order used by every ratio vector (same as WEIGHTS)
+RATIO_NAMES = tuple(WEIGHTS)
+_LEVERAGE_IDX = RATIO_NAMES.index("Leverage (Debt / Tangible Net Worth)")
+
+
 class APARFinancialModel:
     def __init__(self, data: Dict[str, Dict[str, float]]):
         self.data = data
-
-    def calculate_single_year(self, year: str, prev_sales: float = None) -> Dict[str, float]:
-        fin = self.data[year]
-
+        # (year, prev_sales) -> ratio vector in RATIO_NAMES order
+        self._ratio_cache: Dict[Tuple[str, Optional[float]], Tuple[float, ...]] = {}
+
+    def ratio_vector(self, year: str, prev_sales: float = None) -> Tuple[float, ...]:
+        """
+        The eight ratios for one year as a tuple in RATIO_NAMES order.
+        Computed once per (year, prev_sales) and reused afterwards.
+        """
+        key = (year, prev_sales)
+        vec = self._ratio_cache.get(key)
+        if vec is None:
+            vec = self._compute_ratios(self.data[year], prev_sales)
+            self._ratio_cache[key] = vec
+        return vec
+
+    @staticmethod
+    def _compute_ratios(fin: Dict[str, float], prev_sales: Optional[float]) -> Tuple[float, ...]:
         npm = fin["Net Profit"] / fin["Net Sales"]
         growth = ((fin["Net Sales"] - prev_sales) / prev_sales) if prev_sales else 0.0
 
@@ -69,83 +165,82 @@ class APARFinancialModel:
         tnw = fin["Shareholders Equity"] - fin["Intangible assets"]
         leverage = fin["Total Liabilities"] / tnw
 
-        return {
-            "Net Profit Margin": npm,
-            "Sales Growth or Turnover Growth": growth,
-            "Net CF from Operations/EBITDA": cf_ebitda,
-            "DSCR": dscr,
-            "Interest coverage ratio (ICR)": icr,
-            "Current Ratio": current_ratio,
-            "Cash Conversion Cycle": ccc,
-            "Leverage (Debt / Tangible Net Worth)": leverage
-        }
+        return (npm, growth, cf_ebitda, dscr, icr, current_ratio, ccc, leverage)
 
-    def weighted_ratios(self, curr_year: str, prev_year: str, hist_sales: float) -> Dict[str, float]:
-        prev = self.calculate_single_year(prev_year, hist_sales)
-        curr = self.calculate_single_year(curr_year, self.data[prev_year]["Net Sales"])
+    def calculate_single_year(self, year: str, prev_sales: float = None) -> Dict[str, float]:
+        return dict(zip(RATIO_NAMES, self.ratio_vector(year, prev_sales)))
+
+    def weighted_vector(self, curr_year: str, prev_year: str, hist_sales: float) -> Tuple[float, ...]:
+        """
+        70/30 blend of the current and previous year vectors; leverage is current year only.
+        """
+        prev = self.ratio_vector(prev_year, hist_sales)
+        curr = self.ratio_vector(curr_year, self.data[prev_year]["Net Sales"])
+        return tuple(
+            c if i == _LEVERAGE_IDX else 0.70 * c + 0.30 * p
+            for i, (c, p) in enumerate(zip(curr, prev))
+        )
 
-        final = {}
-        for k in curr:
-            if k == "Leverage (Debt / Tangible Net Worth)":
-                final[k] = curr[k]
-            else:
-                final[k] = 0.70 * curr[k] + 0.30 * prev[k]
-        return final
+    def weighted_ratios(self, curr_year: str, prev_year: str, hist_sales: float) -> Dict[str, float]:
+        return dict(zip(RATIO_NAMES, self.weighted_vector(curr_year, prev_year, hist_sales)))
 
 
 # 3. SCORING FUNCTION
 
 
-def get_score(metric: str, value: float) -> int:
-    if metric == "Cash Conversion Cycle":
-        if value <= 30.01: return 600
-        elif value <= 60.01: return 300
-        return 0
+def band_index(table: BandTable, value: float) -> int:
+    """
+    Position of value in table.scores. Bounds are inclusive on both sides:
+    higher-is-better counts bounds <= value, lower-is-better counts bounds < value.
+    """
+    if table.higher_is_better:
+        return bisect_right(table.bounds, value)
+    return bisect_left(table.bounds, value)
 
-    if metric == "Leverage (Debt / Tangible Net Worth)":
-        if value <= 1.00: return 500
-        elif value <= 1.70: return 400
-        elif value <= 2.50: return 300
-        elif value <= 3.00: return 200
-        elif value <= 3.50: return 100
-        return 0
 
-    for threshold, score in RULES.get(metric, []):
-        if value >= threshold:
-            return score
-    return 0
+def get_score(metric: str, value: float, bands: Dict[str, BandTable] = BANDS) -> int:
+    if bands is BANDS:
+        scorer = _BAND_SCORERS.get(metric)
+        return 0 if scorer is None else scorer(value)  # ladders score NaN as 0
+    table = bands.get(metric)
+    if table is None or value != value:  # unknown metric or NaN
+        return 0
+    return table.scores[band_index(table, value)]
 
 
 # 4. FASTAPI ENTRY POINT
 
 
-def calculate_fr_score(inputs: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
-    years = sorted(inputs.keys())
-    if len(years) < 3:
-        raise ValueError("At least 3 years of data required")
-
-    hist_year, prev_year, curr_year = years[-3], years[-2], years[-1]
-
-    model = APARFinancialModel(inputs)
-
-    prev_ratios = model.calculate_single_year(prev_year, inputs[hist_year]["Net Sales"])
-    curr_ratios = model.calculate_single_year(curr_year, inputs[prev_year]["Net Sales"])
-    weighted = model.weighted_ratios(curr_year, prev_year, inputs[hist_year]["Net Sales"])
-
-    intermediate = {
-        k: {
-            "previous_year": round(prev_ratios[k], 4),
-            "current_year": round(curr_ratios[k], 4)
-        }
-        for k in prev_ratios
-    }
-
+def window_vectors(model: APARFinancialModel, hist_year: str, prev_year: str,
+                   curr_year: str) -> Tuple[Tuple[float, ...], Tuple[float, ...], Tuple[float, ...]]:
+    """
+    (previous year, current year, 70/30 weighted) ratio vectors of one 3-year window.
+    """
+    hist_sales = model.data[hist_year]["Net Sales"]
+    prev_ratios = model.ratio_vector(prev_year, hist_sales)
+    curr_ratios = model.ratio_vector(curr_year, model.data[prev_year]["Net Sales"])
+    weighted = model.weighted_vector(curr_year, prev_year, hist_sales)
+    return prev_ratios, curr_ratios, weighted
+
+
+def score_vectors(
+    prev_ratios: Tuple[float, ...],
+    curr_ratios: Tuple[float, ...],
+    weighted: Tuple[float, ...],
+    weights: Dict[str, float] = WEIGHTS,
+    bands: Dict[str, BandTable] = BANDS,
+) -> Dict[str, Any]:
+    """
+    The /fr/score result for one window's ratio vectors under the given weights and bands.
+    """
     total_score = 0.0
     breakdown = {}
+    intermediate = {}
 
-    for metric, weight in WEIGHTS.items():
-        value = round(weighted[metric], 3)
-        score = get_score(metric, value)
+    for i, metric in enumerate(RATIO_NAMES):
+        weight = weights[metric]
+        value = round(weighted[i], 3)
+        score = get_score(metric, value, bands)
         total_score += score * weight
 
         breakdown[metric] = {
@@ -153,9 +248,73 @@ def calculate_fr_score(inputs: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
             "score": score,
             "weight_percent": int(weight * 100)
         }
+        intermediate[metric] = {
+            "previous_year": round(prev_ratios[i], 4),
+            "current_year": round(curr_ratios[i], 4)
+        }
 
     return {
         "total_score": round(total_score, 3),
         "financial_ratios": breakdown,
         "intermediate_financial_ratios": intermediate
     }
+
+
+def _score_window(model: APARFinancialModel, hist_year: str, prev_year: str, curr_year: str) -> Dict[str, Any]:
+    """
+    Score one 3-year window (history, previous, current) of a model.
+    """
+    return score_vectors(*window_vectors(model, hist_year, prev_year, curr_year))
+
+
+def calculate_fr_score(inputs: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    years = sorted(inputs.keys())
+    if len(years) < 3:
+        raise ValueError("At least 3 years of data required")
+
+    hist_year, prev_year, curr_year = years[-3], years[-2], years[-1]
+    return _score_window(APARFinancialModel(inputs), hist_year, prev_year, curr_year)
+
+
+def calculate_fr_trajectory(inputs: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Score every consecutive 3-year window of a long history.
+    Each year's ratios are computed once and shared by the overlapping windows.
+    Returns the score per window (keyed by its current year) and every band
+    change between consecutive windows.
+    """
+    years = sorted(inputs.keys())
+    if len(years) < 3:
+        raise ValueError("At least 3 years of data required")
+
+    model = APARFinancialModel(inputs)
+    trajectory = []
+    band_changes = []
+    last = None
+
+    for hist_year, prev_year, curr_year in zip(years, years[1:], years[2:]):
+        result = _score_window(model, hist_year, prev_year, curr_year)
+        ratios = result["financial_ratios"]
+
+        if last is not None:
+            for metric, r in ratios.items():
+                before = last[metric]
+                if r["score"] != before["score"]:
+                    band_changes.append({
+                        "year": curr_year,
+                        "metric": metric,
+                        "previous_score": before["score"],
+                        "score": r["score"],
+                        "previous_value": before["value"],
+                        "value": r["value"]
+                    })
+        last = ratios
+
+        trajectory.append({
+            "year": curr_year,
+            "window": [hist_year, prev_year, curr_year],
+            "total_score": result["total_score"],
+            "financial_ratios": ratios
+        })
+
+    return {"trajectory": trajectory, "band_changes": band_changes}
@@ -0,0 +1,174 @@
+# fr_portfolio.py
+# Vectorized FR scoring for many borrowers at once (same math as fr_logic).
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fr_logic import FR_SCORECARD, INPUT_METRICS, RATIO_NAMES
+from scorecard import round_scalar
+
+
+LEVERAGE = "Leverage (Debt / Tangible Net Worth)"
+
+_COL = {name: i for i, name in enumerate(INPUT_METRICS)}
+_SALES = _COL["Net Sales"]
+_LEVERAGE_IDX = RATIO_NAMES.index(LEVERAGE)
+
+
+# 1. BANDS
+# banding, the weighted total and the exact 3-decimal rounding come from
+# scorecard / fr_logic.FR_SCORECARD, the same compiled card get_score uses
+
+
+def score_values(metric: str, values: np.ndarray) -> np.ndarray:
+    """
+    Vectorized get_score: band score for every value. NaN scores 0.
+    """
+    return FR_SCORECARD.band_scores(metric, values)
+
+
+# 2. RATIO MATH
+
+def year_ratios(fin: np.ndarray, prev_sales: np.ndarray) -> np.ndarray:
+    """
+    APARFinancialModel.calculate_single_year for N borrowers.
+    fin: (N, 16) in INPUT_METRICS order, prev_sales: (N,). Returns (N, 8) in RATIO_NAMES order.
+    """
+    def col(name: str) -> np.ndarray:
+        return fin[:, _COL[name]]
+
+    sales = col("Net Sales")
+    cogs = col("COGS")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        npm = col("Net Profit") / sales
+        growth = np.where(prev_sales != 0, (sales - prev_sales) / prev_sales, 0.0)
+
+        cf_ebitda = col("Operating Cash flows") / col("EBITDA")
+        dscr = col("EBITDA") / col("Debt Service")
+        icr = col("EBIT") / col("Interest Payments")
+        current_ratio = col("Current Assets") / col("Current Liabilities")
+
+        inv_days = (col("Inventory") / cogs) * 365
+        rec_days = (col("Trade and other receivables") / sales) * 365
+        pay_days = (col("Trade Creditors") / cogs) * 365
+        ccc = inv_days + rec_days - pay_days
+
+        tnw = col("Shareholders Equity") - col("Intangible assets")
+        leverage = col("Total Liabilities") / tnw
+
+    return np.stack([npm, growth, cf_ebitda, dscr, icr, current_ratio, ccc, leverage], axis=1)
+
+
+def weighted_ratios(prev: np.ndarray, curr: np.ndarray) -> np.ndarray:
+    """
+    70/30 current/previous blend; leverage uses the current year only.
+    """
+    final = 0.70 * curr + 0.30 * prev
+    final[:, _LEVERAGE_IDX] = curr[:, _LEVERAGE_IDX]
+    return final
+
+
+# 3. PORTFOLIO SCORING
+
+def score_portfolio(data: np.ndarray) -> Dict[str, Any]:
+    """
+    Score N borrowers from a float array of shape (N, years, 16), years ascending,
+    metrics in INPUT_METRICS order. Only the last three years are used, as in
+    calculate_fr_score.
+
+    Returns arrays: "total_score" (N,), "values" (N, 8), "scores" (N, 8) in
+    RATIO_NAMES order, and "ok" (N,) which is False where a ratio could not be
+    computed (zero denominator or missing input).
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim != 3 or data.shape[2] != len(INPUT_METRICS):
+        raise ValueError(f"Expected an array of shape (borrowers, years, {len(INPUT_METRICS)})")
+    if data.shape[1] < 3:
+        raise ValueError("At least 3 years of data required")
+
+    sales = data[:, :, _SALES]
+    prev = year_ratios(data[:, -2], sales[:, -3])
+    curr = year_ratios(data[:, -1], sales[:, -2])
+    weighted = weighted_ratios(prev, curr)
+
+    ok = np.isfinite(prev).all(axis=1) & np.isfinite(curr).all(axis=1)
+
+    # same 3-decimal rounding as the scalar path before banding
+    values = round_scalar(weighted, 3)
+    scores = np.empty(values.shape, dtype=np.int64)
+    for j, metric in enumerate(RATIO_NAMES):
+        scores[:, j] = score_values(metric, values[:, j])
+
+    # accumulated in WEIGHTS order, matching the scalar float sum
+    total = FR_SCORECARD.weighted_total([scores[:, j] for j in range(len(RATIO_NAMES))])
+
+    return {
+        "total_score": round_scalar(total, 3),
+        "values": values,
+        "scores": scores,
+        "ok": ok
+    }
+
+
+def portfolio_from_payloads(
+    payloads: List[Dict[str, Dict[str, float]]]
+) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Stack /fr/score style payloads into an (N, 3, 16) array using each
+    borrower's last three years. As in calculate_fr_score, only Net Sales is
+    required in the first (history) year; its other metrics are left NaN.
+    Rows that cannot be read are left as NaN and reported in the returned
+    errors list.
+    """
+    data = np.full((len(payloads), 3, len(INPUT_METRICS)), np.nan)
+    errors: List[Dict[str, Any]] = []
+
+    for i, payload in enumerate(payloads):
+        years = sorted(payload.keys())
+        if len(years) < 3:
+            errors.append({"index": i, "error": "At least 3 years of data required"})
+            continue
+        try:
+            year = years[-3]
+            data[i, 0, _SALES] = payload[year]["Net Sales"]
+            for y, year in enumerate(years[-2:], start=1):
+                fin = payload[year]
+                data[i, y] = [fin[m] for m in INPUT_METRICS]
+        except KeyError as e:
+            errors.append({"index": i, "error": f"Missing metric {e} in year {year}"})
+        except (TypeError, ValueError) as e:
+            errors.append({"index": i, "error": str(e)})
+    return data, errors
+
+
+def calculate_fr_scores(
+    payloads: Optional[List[Dict[str, Dict[str, float]]]] = None,
+    data: Optional[List[List[List[float]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Batch counterpart of calculate_fr_score. Takes either a list of /fr/score
+    payloads or a nested (borrowers, years, 16) list in INPUT_METRICS order.
+    """
+    if (payloads is None) == (data is None):
+        raise ValueError("Provide exactly one of 'borrowers' or 'data'")
+
+    if payloads is not None:
+        array, errors = portfolio_from_payloads(payloads)
+    else:
+        array, errors = np.asarray(data, dtype=float), []
+
+    result = score_portfolio(array)
+
+    failed = {e["index"] for e in errors}
+    for i in np.flatnonzero(~result["ok"]).tolist():
+        if i not in failed:
+            errors.append({"index": i, "error": "Ratio could not be computed (zero or missing denominator)"})
+            failed.add(i)
+    errors.sort(key=lambda e: e["index"])
+
+    scores = [
+        None if i in failed else total
+        for i, total in enumerate(result["total_score"].tolist())
+    ]
+    return {"fr_scores": scores, "errors": errors}
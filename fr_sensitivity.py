@@ -0,0 +1,160 @@
+# fr_sensitivity.py
+# What-if analysis for one FR payload: how the score moves when input metrics are nudged.
+#
+# A perturbation scales one of the 16 input metrics by change_percent, in the
+# given years of the scoring window (all three by default):
+#
+#   {"metric": "Net Sales", "change_percent": -10, "years": ["2024"]}
+#
+# An explicit "years" must name at least one year. As in calculate_fr_score,
+# only Net Sales is needed in the first (history) year of the window.
+#
+# Every scenario is a copy of the window with its perturbation applied. All of
+# them are stacked into one (scenarios, 3, 16) array and scored by
+# fr_portfolio.score_portfolio in a single vectorized pass. The unperturbed score
+# is calculate_fr_score's. Each scenario returns its total, the delta from
+# that base and the bands that changed.
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from fr_logic import INPUT_METRICS, RATIO_NAMES, WEIGHTS, calculate_fr_score
+from fr_portfolio import score_portfolio
+
+
+# percentages tried on every input metric when no perturbations are given
+DEFAULT_STEPS = (-10.0, -5.0, 5.0, 10.0)
+MAX_SCENARIOS = 2000
+
+_COL = {name: i for i, name in enumerate(INPUT_METRICS)}
+
+
+def _window(inputs: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    The three scoring years, ascending. Raises ValueError naming the first
+    metric calculate_fr_score would need but cannot find.
+    """
+    years = sorted(inputs.keys())
+    if len(years) < 3:
+        raise ValueError("At least 3 years of data required")
+    window = years[-3:]
+    for k, year in enumerate(window):
+        required = ("Net Sales",) if k == 0 else INPUT_METRICS
+        missing = [m for m in required if m not in inputs[year]]
+        if missing:
+            raise ValueError(f"Missing metric '{missing[0]}' in year {year}")
+    return window
+
+
+def _perturbations(
+    perturbations: Optional[List[Dict[str, Any]]],
+    steps: Optional[Sequence[float]],
+    window: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Validated perturbations as {"metric", "change_percent", "years"}; without
+    explicit ones, every input metric at every step across the whole window.
+    """
+    if perturbations is None:
+        perturbations = [
+            {"metric": metric, "change_percent": step}
+            for metric in INPUT_METRICS
+            for step in (DEFAULT_STEPS if steps is None else steps)
+        ]
+    if len(perturbations) > MAX_SCENARIOS:
+        raise ValueError(f"At most {MAX_SCENARIOS} perturbations per request")
+
+    result = []
+    for i, p in enumerate(perturbations):
+        metric = p.get("metric")
+        if metric not in _COL:
+            raise ValueError(f"Perturbation {i}: unknown metric '{metric}'")
+        try:
+            change = float(p.get("change_percent"))
+        except (TypeError, ValueError):
+            raise ValueError(f"Perturbation {i}: change_percent must be a number")
+        if not math.isfinite(change):
+            raise ValueError(f"Perturbation {i}: change_percent must be finite")
+        years = p.get("years")
+        if years is None:
+            years = window
+        elif not isinstance(years, (list, tuple)) or not years:
+            raise ValueError(f"Perturbation {i}: years must be a non-empty list of years in the scoring window")
+        outside = [y for y in years if y not in window]
+        if outside:
+            raise ValueError(
+                f"Perturbation {i}: year(s) {', '.join(map(str, outside))} not in the scoring window {', '.join(window)}"
+            )
+        result.append({"metric": metric, "change_percent": change, "years": sorted(set(years))})
+    return result
+
+
+def calculate_fr_sensitivity(
+    inputs: Dict[str, Dict[str, float]],
+    perturbations: Optional[List[Dict[str, Any]]] = None,
+    steps: Optional[Sequence[float]] = None,
+) -> Dict[str, Any]:
+    """
+    Score every perturbation of one /fr/score payload.
+
+    Returns "base" (the calculate_fr_score result) and one entry per
+    perturbation with its total_score, delta from the base and band_changes
+    (ratios whose band score moved, with the weighted effect on the total).
+    A scenario whose ratios cannot be computed (e.g. a denominator scaled to
+    zero) gets an "error" instead.
+    """
+    window = _window(inputs)
+    base = calculate_fr_score(inputs)  # also validates the values
+    scenarios = _perturbations(perturbations, steps, window)
+
+    # the history year contributes only Net Sales; its other metrics stay NaN
+    base_data = np.full((3, len(INPUT_METRICS)), np.nan)
+    base_data[0, _COL["Net Sales"]] = inputs[window[0]]["Net Sales"]
+    for y, year in enumerate(window[1:], start=1):
+        base_data[y] = [inputs[year][m] for m in INPUT_METRICS]
+    data = np.repeat(base_data[np.newaxis], len(scenarios), axis=0)
+    for k, p in enumerate(scenarios):
+        factor = 1 + p["change_percent"] / 100
+        col = _COL[p["metric"]]
+        for year in p["years"]:
+            data[k, window.index(year), col] *= factor
+
+    result = score_portfolio(data)
+    ok = result["ok"].tolist()
+    values = result["values"]
+    scores = result["scores"]
+    totals = result["total_score"].tolist()
+
+    base_total = base["total_score"]
+    base_ratios = [base["financial_ratios"][m] for m in RATIO_NAMES]
+    results = []
+    for k, p in enumerate(scenarios):
+        entry = dict(p)
+        if not ok[k]:
+            entry["error"] = "Ratio could not be computed (zero or missing denominator)"
+            results.append(entry)
+            continue
+
+        row_scores = scores[k].tolist()
+        row_values = values[k].tolist()
+        band_changes = []
+        for j, metric in enumerate(RATIO_NAMES):
+            before = base_ratios[j]
+            if row_scores[j] != before["score"]:
+                band_changes.append({
+                    "metric": metric,
+                    "previous_score": before["score"],
+                    "score": row_scores[j],
+                    "previous_value": before["value"],
+                    "value": row_values[j],
+                    "score_delta": round((row_scores[j] - before["score"]) * WEIGHTS[metric], 3)
+                })
+
+        score = totals[k]
+        entry["total_score"] = score
+        entry["delta"] = round(score - base_total, 3)
+        entry["band_changes"] = band_changes
+        results.append(entry)
+
+    return {"base": base, "scenarios": results}
@@ -0,0 +1,237 @@
+# industry_resolver.py
+# Industry name resolution: exact, normalized, synonym, then typo-tolerant match.
+#
+# "forestry fisheries & hunting", "FORESTRY, FISHERIES AND HUNTING" and
+# "Forrestry Fisheries and Hunting" all resolve to "Forestry, Fisheries and Hunting".
+# Everything is indexed once when the resolver is built; a fuzzy lookup only
+# scores the few names sharing the most trigrams with the query.
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# abbreviations and symbols, applied per word after lowercasing
+TOKEN_SYNONYMS = {
+    "&": "and",
+    "mfg": "manufacturing",
+    "manuf": "manufacturing",
+    "manfac": "manufacturing",
+    "manufacture": "manufacturing",
+    "misc": "miscellaneous",
+    "svc": "services",
+    "svcs": "services",
+    "service": "services",
+    "transport": "transportation",
+    "equip": "equipment",
+    "prod": "products",
+    "product": "products",
+    "elec": "electrical",
+    "govt": "government",
+}
+
+# common names that are not spelling variants of the canonical industry
+INDUSTRY_SYNONYMS = {
+    "Agriculture": "Agricultural",
+    "Farming": "Agricultural",
+    "Fishing": "Forestry, Fisheries and Hunting",
+    "Forestry": "Forestry, Fisheries and Hunting",
+    "Hospitality": "Hotels, Restaurants and Drinking Places",
+    "Hotels": "Hotels, Restaurants and Drinking Places",
+    "Restaurants": "Hotels, Restaurants and Drinking Places",
+    "Insurance": "Insurance agents, brokers, and service",
+    "Chemicals": "Chemicals Products Manufacturing",
+    "Electronics": "Electrical and Electronic Manufacturing",
+    "Furniture": "Furniture and Fixtures Manufacturing",
+    "Machinery": "Industrial Machinery Manufacturing",
+    "Plastics": "Rubber and Misc. Plastics Manufacturing",
+    "Printing": "Printing and Publishing",
+    "Publishing": "Printing and Publishing",
+    "Textiles": "Textile Manufacturing",
+    "Oil and Gas": "Oil and Gas Extraction",
+    "NEC": "Not Elsewhere Classified",
+    "Retail": "General Retail",
+    "Healthcare": "Health Services",
+    "Health Care": "Health Services",
+    "Legal": "Legal Services",
+    "Education": "Education and Social Services",
+    "Telecom": "Telecommunications",
+    "Airlines": "Transportation by Air",
+    "Aviation": "Transportation by Air",
+    "Shipping": "Freight and Water Transportation",
+    "Public Transit": "Local and Interurban Passenger Transit",
+}
+
+# fuzzy matches below this confidence are rejected
+MIN_CONFIDENCE = 0.8
+
+# a fuzzy match must beat the runner-up by this much; sibling industries
+# ("Wholesale Trade - Durable/Nondurable Goods") are within MIN_CONFIDENCE of
+# each other, so a typo between them is ambiguous rather than a coin toss
+MIN_MARGIN = 0.05
+
+# fuzzy candidates (by shared trigrams) checked with edit distance
+FUZZY_CANDIDATES = 5
+
+MEMO_SIZE = 4096
+_MISSING = object()  # memo sentinel; None is a cached "no match"
+
+_WORD_RE = re.compile(r"[a-z0-9]+|&")
+
+
+class IndustryMatch(NamedTuple):
+    industry: str       # canonical INDUSTRY_DATA key
+    confidence: float   # 1.0 for exact/normalized/synonym, edit-distance similarity for fuzzy
+    method: str         # "exact" | "normalized" | "synonym" | "fuzzy"
+
+
+# ---------- text helpers ----------
+
+def normalize_industry(name: str) -> str:
+    """
+    Lowercase words with abbreviations expanded, punctuation dropped, joined by single spaces.
+    """
+    words = _WORD_RE.findall(str(name).lower())
+    return " ".join(TOKEN_SYNONYMS.get(w, w) for w in words)
+
+
+def _compact(normalized: str) -> str:
+    # "durable goods" and "durablegoods" compare equal
+    return normalized.replace(" ", "")
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Edit distance, bit-parallel (Myers / Hyyro): one pass over b with
+    bitmask updates instead of a len(a) x len(b) table.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return score
+
+
+def _similarity(a: str, b: str) -> float:
+    longest = max(len(a), len(b))
+    return 1.0 - levenshtein(a, b) / longest if longest else 1.0
+
+
+# ---------- resolver ----------
+
+class IndustryResolver:
+    """
+    Precomputed index over a set of canonical industry names.
+    """
+
+    def __init__(self, industries: Iterable[str], synonyms: Optional[Dict[str, str]] = None):
+        self.industries: Tuple[str, ...] = tuple(industries)
+        self._canonical = frozenset(self.industries)
+
+        # compact normalized form -> canonical name
+        self._normalized: Dict[str, str] = {}
+        for name in self.industries:
+            self._normalized.setdefault(_compact(normalize_industry(name)), name)
+
+        self._synonyms: Dict[str, str] = {}
+        for alias, name in (synonyms or {}).items():
+            if name not in self._canonical:
+                continue  # synonym for an industry this data set does not have
+            self._synonyms.setdefault(_compact(normalize_industry(alias)), name)
+
+        # fuzzy index: per name its compact and word-sorted forms, plus trigram postings
+        self._forms: List[Tuple[str, str, str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for name in self.industries:
+            norm = normalize_industry(name)
+            idx = len(self._forms)
+            self._forms.append((name, _compact(norm), "".join(sorted(norm.split()))))
+            for gram in _trigrams(_compact(norm)):
+                self._postings.setdefault(gram, []).append(idx)
+
+        self._memo: Dict[str, Optional[IndustryMatch]] = {}
+
+    def resolve(self, name: str) -> Optional[IndustryMatch]:
+        """
+        Best canonical match for `name`, or None.
+        """
+        # one lookup: another thread may clear() the memo at any moment
+        match = self._memo.get(name, _MISSING)
+        if match is not _MISSING:
+            return match
+        match = self._resolve(name)
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[name] = match
+        return match
+
+    def _resolve(self, name: str) -> Optional[IndustryMatch]:
+        if name in self._canonical:
+            return IndustryMatch(name, 1.0, "exact")
+
+        norm = normalize_industry(name)
+        key = _compact(norm)
+        if not key:
+            return None
+        if key in self._normalized:
+            return IndustryMatch(self._normalized[key], 1.0, "normalized")
+        if key in self._synonyms:
+            return IndustryMatch(self._synonyms[key], 1.0, "synonym")
+
+        ranked = self.suggest(name, FUZZY_CANDIDATES)
+        if not ranked or ranked[0].confidence < MIN_CONFIDENCE:
+            return None
+        if len(ranked) > 1 and ranked[0].confidence - ranked[1].confidence < MIN_MARGIN:
+            return None  # ambiguous
+        return ranked[0]
+
+    def suggest(self, name: str, limit: int = 3) -> List[IndustryMatch]:
+        """
+        Closest industries by edit-distance similarity, best first.
+        Only names sharing trigrams with `name` are considered.
+        """
+        norm = normalize_industry(name)
+        key = _compact(norm)
+        sorted_key = "".join(sorted(norm.split()))
+
+        shared: Dict[int, int] = {}
+        for gram in _trigrams(key):
+            for idx in self._postings.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        candidates = sorted(shared, key=lambda i: -shared[i])[:max(limit, FUZZY_CANDIDATES)]
+
+        scored = []
+        for idx in candidates:
+            canonical, compact, sorted_form = self._forms[idx]
+            # word-sorted comparison catches reordered names
+            confidence = max(_similarity(key, compact), _similarity(sorted_key, sorted_form))
+            scored.append(IndustryMatch(canonical, round(confidence, 3), "fuzzy"))
+        scored.sort(key=lambda m: -m.confidence)
+        return scored[:limit]
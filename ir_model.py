@@ -1,7 +1,11 @@
 # ir_model.py
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+import hashlib
+import json
 import re
+import time
 from industry_data import INDUSTRY_DATA
+from industry_resolver import INDUSTRY_SYNONYMS, IndustryMatch, IndustryResolver
 
 
 # MASTER definition (simplified, same as you approved)
@@ -191,6 +195,17 @@ FACTOR_WEIGHT = 1 / 16  # per earlier design
 
 # ---------- helpers ----------
 
+_SEPARATORS_RE = re.compile(r'[^A-Z0-9]+')
+_NON_ALNUM_RE = re.compile(r'[^A-Z0-9]')
+
+# shortest abbreviation of a label accepted by loose matching ("MOD" for
+# MODERATE); shorter labels must be given in full
+_MIN_PREFIX = 3
+
+# US spellings accepted for MASTER's UK spellings
+_SPELLING_ALIASES = (("LABOUR", "LABOR"), ("Labour", "Labor"))
+
+
 def _normalize_factor_key(label: str) -> str:
     """
     Normalize human-readable factor label to uppercase underscore key,
@@ -200,8 +215,7 @@ def _normalize_factor_key(label: str) -> str:
     k = str(label).upper()
 
     # replace punctuation / spaces with underscore
-    k = re.sub(r'[^A-Z0-9]+', '_', k)
-    k = re.sub(r'__+', '_', k).strip('_')
+    k = _SEPARATORS_RE.sub('_', k).strip('_')
 
     # 🔧 FIX: normalize US vs UK spelling
     k = k.replace("LABOR", "LABOUR")
@@ -209,69 +223,124 @@ def _normalize_factor_key(label: str) -> str:
     return k
 
 
-def _find_factor_def(normalized_key: str) -> Optional[Dict[str, Any]]:
+class FactorEntry(NamedTuple):
+    key: str                          # MASTER factor key, e.g. "SKILLED_LABOUR_GAP"
+    group: str                        # MASTER group key, e.g. "PRODUCTION_CONDITIONS"
+    name: str                         # display name, e.g. "Skilled Labour Gap"
+    scores: Dict[str, int]            # exact label -> score
+    loose: Dict[str, int]             # prefixes (>= _MIN_PREFIX) of an alnum-only label -> score
+    labels: Tuple[Tuple[str, int], ...]  # alnum-only labels in MASTER order
+
+
+def _spelling_variants(text: str) -> List[str]:
+    variants = [text]
+    for uk, us in _SPELLING_ALIASES:
+        if uk in text:
+            variants.append(text.replace(uk, us))
+    return variants
+
+
+def _build_factor_index(master: Dict[str, Any]) -> Dict[str, FactorEntry]:
     """
-    Search MASTER factorGroups for the normalized key.
-    Returns the factor definition dict (copy) plus _group key, or None.
+    Flatten MASTER into one dict. Each factor is reachable by its normalized
+    key and by its display name, plus the US spelling of either.
     """
-    for group_key, group in MASTER["factorGroups"].items():
-        factors = group.get("factors", {})
-        if normalized_key in factors:
-            d = factors[normalized_key].copy()
-            d["_group"] = group_key
-            return d
-    return None
+    index: Dict[str, FactorEntry] = {}
+    for group_key, group in master["factorGroups"].items():
+        for factor_key, factor in group.get("factors", {}).items():
+            scores: Dict[str, int] = {}
+            labels = []
+            for opt in factor.get("assessmentOptions", []):
+                label = str(opt.get("label", "")).upper()
+                score = int(opt.get("score", 0))
+                scores.setdefault(label, score)
+                labels.append((_NON_ALNUM_RE.sub('', label), score))
+
+            # first option in MASTER order wins, as the old linear scan did
+            loose: Dict[str, int] = {}
+            for lab_norm, score in labels:
+                for i in range(min(_MIN_PREFIX, len(lab_norm)), len(lab_norm) + 1):
+                    loose.setdefault(lab_norm[:i], score)
 
-def _lookup_score_from_def(factor_def: Optional[Dict[str, Any]], qualitative_value: str) -> int:
+            entry = FactorEntry(factor_key, group_key, factor["name"], scores, loose, tuple(labels))
+            for alias in _spelling_variants(factor_key) + _spelling_variants(factor["name"]):
+                index[alias] = entry
+    return index
+
+
+FACTOR_INDEX = _build_factor_index(MASTER)
+
+# canonical entries in MASTER order (FACTOR_INDEX also holds aliases)
+FACTORS: Tuple[FactorEntry, ...] = tuple(
+    FACTOR_INDEX[k]
+    for group in MASTER["factorGroups"].values()
+    for k in group.get("factors", {})
+)
+
+
+def _resolve_factor(factor_label: str) -> Optional[FactorEntry]:
     """
-    Given a factor definition and qualitative label return the numeric score.
-    If not found, return 0 (safe fallback).
+    Map a factor label (display name or key, any spelling) to its FactorEntry.
     """
-    if not factor_def:
-        return 0
-    av = str(qualitative_value).strip().upper()
-    for opt in factor_def.get("assessmentOptions", []):
-        if opt.get("label", "").upper() == av:
-            return int(opt.get("score", 0))
-    # loose matching: remove non-alnum and compare startswith
-    av_norm = re.sub(r'[^A-Z0-9]', '', av)
-    for opt in factor_def.get("assessmentOptions", []):
-        lab_norm = re.sub(r'[^A-Z0-9]', '', str(opt.get("label","")).upper())
-        if lab_norm.startswith(av_norm) or av_norm.startswith(lab_norm):
-            return int(opt.get("score", 0))
-    return 0
+    entry = FACTOR_INDEX.get(factor_label)
+    if entry is None:
+        entry = FACTOR_INDEX.get(_normalize_factor_key(factor_label))
+    return entry
 
-# ---------- main functions ----------
 
-def calculate_ir(industry_name: str) -> Dict[str, Any]:
+def _lookup_score(entry: FactorEntry, qualitative_value: str) -> Optional[int]:
     """
-    Compute IR score using INDUSTRY_DATA and MASTER.
-    Returns structured JSON:
-    {
-      "industry": "...",
-      "ir_score": float,
-      "factor_weight": FACTOR_WEIGHT,
-      "factors": [ {factor, qualitative_value, group, raw_score, weighted_score}, ... ]
-    }
+    Given a factor entry and qualitative label return the numeric score.
+    Returns None if the label does not resolve, including a blank or
+    punctuation-only value.
     """
-    if industry_name not in INDUSTRY_DATA:
-        raise ValueError(f"Industry '{industry_name}' not found")
+    score = entry.scores.get(qualitative_value)
+    if score is not None:
+        return score
+    av = str(qualitative_value).strip().upper()
+    score = entry.scores.get(av)
+    if score is not None:
+        return score
+    # loose matching: value is a prefix of a label, or a label is a prefix of the value
+    av_norm = _NON_ALNUM_RE.sub('', av)
+    if not av_norm:
+        return None
+    score = entry.loose.get(av_norm)
+    if score is not None:
+        return score
+    for lab_norm, score in entry.labels:
+        if av_norm.startswith(lab_norm):
+            return score
+    return None
+
+# ---------- compiled score table ----------
 
-    industry_factors = INDUSTRY_DATA[industry_name]
+def _score_industry(industry_name: str, industry_factors: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Resolve every factor of one industry against MASTER.
+    Raises ValueError on an unknown factor label or qualitative value.
+    """
     total_score = 0.0
     breakdown = []
 
     for factor_label, qualitative_value in industry_factors.items():
-        normalized = _normalize_factor_key(factor_label)
-        factor_def = _find_factor_def(normalized)
-        raw_score = _lookup_score_from_def(factor_def, qualitative_value)
+        entry = _resolve_factor(factor_label)
+        if entry is None:
+            raise ValueError(f"Industry '{industry_name}': unknown factor '{factor_label}'")
+
+        raw_score = _lookup_score(entry, qualitative_value)
+        if raw_score is None:
+            raise ValueError(
+                f"Industry '{industry_name}': invalid value '{qualitative_value}' for '{factor_label}'"
+            )
+
         weighted = raw_score * FACTOR_WEIGHT
         total_score += weighted
 
         breakdown.append({
             "factor": factor_label,
             "qualitative_value": qualitative_value,
-            "group": factor_def.get("_group") if factor_def else None,
+            "group": entry.group,
             "raw_score": raw_score,
             "weighted_score": round(weighted, 3)
         })
@@ -283,36 +352,162 @@ def calculate_ir(industry_name: str) -> Dict[str, Any]:
         "factors": breakdown
     }
 
-def generate_matrix() -> Dict[str, Any]:
+
+def compile_ir_table(industry_data: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Score every industry up front: industry name -> calculate_ir result.
+    """
+    return {name: _score_industry(name, factors) for name, factors in industry_data.items()}
+
+
+def validate_industry_data(industry_data: Any) -> None:
+    """
+    Structural checks before compiling: industry name -> {factor label: value},
+    every MASTER factor given exactly once. Labels and values are checked by
+    compile_ir_table. Raises ValueError.
+    """
+    if not isinstance(industry_data, dict) or not industry_data:
+        raise ValueError("Industry data must be a non-empty mapping of industry name -> factors")
+
+    expected = {entry.key for entry in FACTORS}
+    for name, factors in industry_data.items():
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"Invalid industry name {name!r}")
+        if not isinstance(factors, dict):
+            raise ValueError(f"Industry '{name}': factors must be a mapping of factor label -> value")
+
+        seen = set()
+        for label, value in factors.items():
+            if not isinstance(value, str):
+                raise ValueError(f"Industry '{name}': value for '{label}' must be a string")
+            if not _NON_ALNUM_RE.sub('', value.upper()):
+                raise ValueError(f"Industry '{name}': value for '{label}' is blank")
+            entry = _resolve_factor(label)
+            if entry is None:
+                raise ValueError(f"Industry '{name}': unknown factor '{label}'")
+            if entry.key in seen:
+                raise ValueError(f"Industry '{name}': factor '{entry.name}' given more than once")
+            seen.add(entry.key)
+
+        missing = [entry.name for entry in FACTORS if entry.key in expected - seen]
+        if missing:
+            raise ValueError(f"Industry '{name}': missing factors {', '.join(missing)}")
+
+
+class IRState(NamedTuple):
+    """
+    Everything derived from one version of the industry data. Replaced as a
+    whole (see swap_state), never modified in place.
+    """
+    industry_data: Dict[str, Dict[str, str]]
+    table: Dict[str, Dict[str, Any]]  # industry name -> calculate_ir result
+    resolver: IndustryResolver
+    source: str                       # where the data came from
+    version: str                      # content hash of the data
+    loaded_at: float                  # time.time() of the compile
+
+
+def compile_ir_state(industry_data: Dict[str, Dict[str, str]], source: str = "industry_data.py") -> IRState:
+    """
+    Validate and compile industry data into a new IRState. Raises ValueError
+    on bad data; nothing global is touched.
+    """
+    validate_industry_data(industry_data)
+    table = compile_ir_table(industry_data)
+    version = hashlib.sha256(json.dumps(industry_data, sort_keys=True).encode()).hexdigest()[:16]
+    return IRState(
+        industry_data=industry_data,
+        table=table,
+        # case, punctuation, abbreviations, synonyms and typos in industry names
+        resolver=IndustryResolver(table, INDUSTRY_SYNONYMS),
+        source=source,
+        version=version,
+        loaded_at=time.time()
+    )
+
+
+# Every industry is scored once up front. A bad factor label or value fails
+# here instead of scoring 0. Readers take one reference to _STATE and use only
+# that, so a concurrent swap_state never mixes two versions.
+_STATE = compile_ir_state(INDUSTRY_DATA)
+
+
+def current_state() -> IRState:
+    return _STATE
+
+
+def swap_state(state: IRState) -> IRState:
+    """
+    Make `state` current (a single reference assignment). Returns the previous state.
+    """
+    global _STATE
+    previous, _STATE = _STATE, state
+    return previous
+
+# ---------- main functions ----------
+
+def resolve_industry(industry_name: str, state: Optional[IRState] = None) -> IndustryMatch:
+    """
+    Map an industry name as sent by callers to its industry data key,
+    with a match confidence (1.0 unless the name was typo-corrected).
+    Raises ValueError if nothing matches confidently enough.
+    """
+    resolver = (state or _STATE).resolver
+    match = resolver.resolve(industry_name)
+    if match is None:
+        suggestions = [m for m in resolver.suggest(industry_name) if m.confidence >= 0.5]
+        hint = f"; closest: {', '.join(repr(m.industry) for m in suggestions)}" if suggestions else ""
+        raise ValueError(f"Industry '{industry_name}' not found{hint}")
+    return match
+
+
+def calculate_ir(industry_name: str, state: Optional[IRState] = None) -> Dict[str, Any]:
+    """
+    Return the precompiled IR result for an industry (shared, do not mutate).
+    Names that are not exact keys go through resolve_industry; "industry"
+    in the result is always the canonical name:
+    {
+      "industry": "...",
+      "ir_score": float,
+      "factor_weight": FACTOR_WEIGHT,
+      "factors": [ {factor, qualitative_value, group, raw_score, weighted_score}, ... ]
+    }
+    Pass the `state` a caller already resolved the name against, so both
+    steps see the same policy version.
+    """
+    state = state or _STATE
+    result = state.table.get(industry_name)
+    if result is None:
+        result = state.table[resolve_industry(industry_name, state).industry]
+    return result
+
+def generate_matrix(industry_data: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
     """
     Create a matrix representation:
       - industries: [list of industry names in consistent order]
       - factors: [list of factor labels in order]
       - matrix: { factor_label: { industry_name: qualitative_value, ... }, ... }
     Useful for rendering the spreadsheet-like table.
+    Uses the current industry data unless `industry_data` is given.
     """
-    industries = list(INDUSTRY_DATA.keys())
-    # gather unique factor labels in order of MASTER factorGroups, falling back to any keys in INDUSTRY_DATA
-    factors_ordered: List[str] = []
-    for group in MASTER["factorGroups"].values():
-        for k, v in group["factors"].items():
-            # the displayed label is v["name"]
-            factors_ordered.append(v["name"])
-
-    # also include any other factor labels that exist in industry_data but not in MASTER (defensive)
-    extra_factors = []
+    if industry_data is None:
+        industry_data = _STATE.industry_data
+    industries = list(industry_data.keys())
+    # factor labels in order of MASTER factorGroups; the displayed label is the MASTER name
+    factors_ordered: List[str] = [entry.name for entry in FACTORS]
+    matrix: Dict[str, Dict[str, str]] = {f: dict.fromkeys(industries, "") for f in factors_ordered}
+
     for ind in industries:
-        for f in INDUSTRY_DATA[ind].keys():
-            if f not in factors_ordered and f not in extra_factors:
-                extra_factors.append(f)
-    factors_ordered.extend(extra_factors)
-
-    matrix = {}
-    for f in factors_ordered:
-        row = {}
-        for ind in industries:
-            row[ind] = INDUSTRY_DATA[ind].get(f, "")  # empty if missing
-        matrix[f] = row
+        for f, value in industry_data[ind].items():
+            entry = _resolve_factor(f)
+            if entry is not None:
+                matrix[entry.name][ind] = value
+            else:
+                # factor not in MASTER (defensive): append it as an extra row
+                if f not in matrix:
+                    factors_ordered.append(f)
+                    matrix[f] = dict.fromkeys(industries, "")
+                matrix[f][ind] = value
 
     return {
         "industries": industries,
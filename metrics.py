@@ -0,0 +1,333 @@
+# metrics.py
+# Prometheus-style request metrics: counts, errors and latency histograms per route,
+# with time split into parse/validate, scoring and serialization.
+#
+# Hot path is lock-free: every thread writes only to its own shard and shards are
+# summed when /metrics is scraped. With several worker processes, set
+# METRICS_MULTIPROC_DIR to a shared directory: a background thread in each worker
+# writes its totals there (every METRICS_FLUSH_SECONDS while it has new requests,
+# and once more at exit) and a scrape on any worker adds them up. Files left by
+# workers that no longer exist are dropped at scrape time (see mark_process_dead).
+import atexit
+import contextvars
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# upper bounds in seconds; a final +Inf bucket is implied
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR")
+FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "1.0"))
+
+# per-request phase timings, shared with handler threads through the context
+_PHASES: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("metrics_phases", default=None)
+
+
+class timed:
+    """
+    Context manager adding the time spent in the block to `phase` for the
+    current request. A no-op outside a request.
+    """
+    __slots__ = ("phase", "phases", "start")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self) -> None:
+        self.phases = _PHASES.get()
+        if self.phases is not None:
+            self.start = perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.phases is not None:
+            self.phases[self.phase] = self.phases.get(self.phase, 0.0) + perf_counter() - self.start
+
+
+class _Shard:
+    """
+    One thread's counters. Histogram rows are [bucket counts..., +Inf, sum, count].
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.histograms: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, route: str, phase: str, seconds: float) -> None:
+        row = self.histograms.get((route, phase))
+        if row is None:
+            row = self.histograms[(route, phase)] = [0] * (len(LATENCY_BUCKETS) + 3)
+        row[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        row[-2] += seconds
+        row[-1] += 1
+
+
+def _shard_file(pid: int) -> str:
+    return f"metrics_{pid}.json"
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate it; stale files are left to mark_process_dead
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Drop a finished worker's totals from MULTIPROC_DIR, e.g. from a process
+    manager's child-exit hook. Scrapes also do this for any pid that is gone.
+    """
+    if MULTIPROC_DIR:
+        try:
+            os.remove(os.path.join(MULTIPROC_DIR, _shard_file(pid)))
+        except FileNotFoundError:
+            pass
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()  # only taken when a new thread shows up
+        # multiprocess mode: flusher thread of this process, and whether requests
+        # were observed since its last write
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._dirty = False
+        self._atexit_registered = False
+        if hasattr(os, "register_at_fork"):
+            # threads do not survive fork; a worker starts its own on first request
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe_request(self, route: str, status: int, total: float, phases: Dict[str, float]) -> None:
+        shard = self._shard()
+        key = (route, str(status))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+
+        score = phases.get("score", 0.0)
+        serialize = phases.get("serialize", 0.0)
+        shard.observe(route, "total", total)
+        shard.observe(route, "parse", max(total - score - serialize, 0.0))
+        if score:
+            shard.observe(route, "score", score)
+        if serialize:
+            shard.observe(route, "serialize", serialize)
+
+        if MULTIPROC_DIR:
+            # set after the counts, so the flusher never clears it before seeing them
+            self._dirty = True
+            if self._flusher is None:
+                self._start_flusher()
+
+    # ---------- multiprocess flushing ----------
+
+    def _reset_after_fork(self) -> None:
+        self._flusher = None
+        self._stop = threading.Event()
+        self._dirty = False
+
+    def _start_flusher(self) -> None:
+        with self._shards_lock:
+            if self._flusher is not None:
+                return
+            thread = threading.Thread(target=self._flush_loop, args=(self._stop,), name="metrics-flush", daemon=True)
+            self._flusher = thread
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+        thread.start()
+
+    def _flush_loop(self, stop: threading.Event) -> None:
+        # file I/O happens here, never on the request path
+        while not stop.wait(FLUSH_SECONDS):
+            self._flush_if_dirty()
+
+    def _flush_if_dirty(self) -> None:
+        if self._dirty and MULTIPROC_DIR:
+            self._dirty = False
+            try:
+                self.flush()
+            except OSError:
+                self._dirty = True  # retried next interval
+
+    def close(self) -> None:
+        """
+        Stop the flusher and write the last totals. Registered with atexit.
+        """
+        self._stop.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self._flush_if_dirty()
+
+    # ---------- aggregation ----------
+
+    @staticmethod
+    def _merge(parts: Iterable[Tuple[Iterable, Iterable]]) -> Dict[str, Any]:
+        # parts: (((route, status), n) items, ((route, phase), row) items)
+        requests: Dict[Tuple[str, str], int] = {}
+        histograms: Dict[Tuple[str, str], List[float]] = {}
+        for request_items, histogram_items in parts:
+            for key, n in request_items:
+                requests[key] = requests.get(key, 0) + n
+            for key, row in histogram_items:
+                acc = histograms.setdefault(key, [0] * len(row))
+                for i, v in enumerate(row):
+                    acc[i] += v
+        return {
+            "requests": [[r, s, n] for (r, s), n in requests.items()],
+            "histograms": [[r, p, row] for (r, p), row in histograms.items()]
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Totals of this process as plain JSON-able data.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        # list() copies so a concurrent insert cannot break iteration
+        return self._merge((list(s.requests.items()), list(s.histograms.items())) for s in shards)
+
+    def flush(self) -> None:
+        """
+        Write this process's totals to MULTIPROC_DIR (atomic replace).
+        """
+        path = os.path.join(MULTIPROC_DIR, _shard_file(os.getpid()))
+        fd, tmp = tempfile.mkstemp(dir=MULTIPROC_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Totals across all worker processes in multiprocess mode, else this process.
+        """
+        own = self.snapshot()
+        if not MULTIPROC_DIR:
+            return own
+
+        own_pid = os.getpid()
+        snapshots = [own]
+        for name in os.listdir(MULTIPROC_DIR):
+            if not name.startswith("metrics_") or not name.endswith(".json"):
+                continue
+            try:
+                pid = int(name[len("metrics_"):-len(".json")])
+            except ValueError:
+                continue
+            if pid == own_pid:
+                continue
+            if not _pid_alive(pid):
+                mark_process_dead(pid)
+                continue
+            try:
+                with open(os.path.join(MULTIPROC_DIR, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # being replaced or unreadable; picked up next scrape
+
+        return self._merge(
+            ((((r, st), n) for r, st, n in snap["requests"]),
+             (((r, p), row) for r, p, row in snap["histograms"]))
+            for snap in snapshots
+        )
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        data = self.collect()
+        lines = [
+            "# HELP engine_requests_total Requests by route and status code.",
+            "# TYPE engine_requests_total counter",
+        ]
+        errors: Dict[str, int] = {}
+        for route, status, n in sorted(data["requests"]):
+            lines.append(f'engine_requests_total{{route="{route}",status="{status}"}} {n}')
+            if int(status) >= 400:
+                errors[route] = errors.get(route, 0) + n
+
+        lines += [
+            "# HELP engine_request_errors_total Requests answered with a 4xx/5xx status.",
+            "# TYPE engine_request_errors_total counter",
+        ]
+        for route, n in sorted(errors.items()):
+            lines.append(f'engine_request_errors_total{{route="{route}"}} {n}')
+
+        lines += [
+            "# HELP engine_request_duration_seconds Request latency; phase=total|parse|score|serialize.",
+            "# TYPE engine_request_duration_seconds histogram",
+        ]
+        for route, phase, row in sorted(data["histograms"]):
+            labels = f'route="{route}",phase="{phase}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), row[:-2]):
+                cumulative += n
+                lines.append(f'engine_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"engine_request_duration_seconds_sum{{{labels}}} {row[-2]}")
+            lines.append(f"engine_request_duration_seconds_count{{{labels}}} {row[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times every HTTP request and records it under the
+    matched route's path template ("unmatched" for 404s).
+    """
+
+    def __init__(self, app: ASGIApp, registry: Registry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases: Dict[str, float] = {}
+        token = _PHASES.set(phases)
+        status = 500
+        start = perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            total = perf_counter() - start
+            _PHASES.reset(token)
+            route = scope.get("route")
+            self.registry.observe_request(getattr(route, "path", "unmatched"), status, total, phases)
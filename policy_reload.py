@@ -0,0 +1,159 @@
+# policy_reload.py
+# Industry policy data from an external JSON/YAML file, reloaded without a restart.
+#
+#   INDUSTRY_DATA_FILE=/etc/engine/industries.yaml uvicorn app:app
+#
+# The file holds the same mapping as INDUSTRY_DATA (industry -> factor -> value).
+# A watcher thread polls it; on change the new data is validated against MASTER
+# and compiled into a fresh IRState in that thread, then made current with one
+# reference swap. Requests never wait, and a bad file leaves the previous
+# tables in place (the error is reported by status()).
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import ir_model
+from ir_model import compile_ir_state, swap_state
+
+try:
+    import yaml
+except ImportError:  # optional, only needed for .yaml/.yml files
+    yaml = None
+
+
+logger = logging.getLogger(__name__)
+
+POLICY_FILE = os.environ.get("INDUSTRY_DATA_FILE")
+POLL_SECONDS = float(os.environ.get("INDUSTRY_DATA_POLL_SECONDS", "2.0"))
+
+
+def load_policy_file(path: str) -> Dict[str, Any]:
+    """
+    Parse a JSON or YAML (.yaml/.yml) industry data file. Raises ValueError.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        if path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError("Reading YAML policy files requires PyYAML (pip install pyyaml)")
+            return yaml.safe_load(raw)
+        return json.loads(raw)
+    except ValueError:
+        raise
+    except Exception as e:  # yaml.YAMLError and friends
+        raise ValueError(f"Cannot parse {path}: {e}")
+
+
+class PolicyWatcher:
+    """
+    Daemon thread reloading `path` whenever its mtime or size changes.
+    Call load() once at startup so a bad file fails fast, then start().
+    """
+
+    def __init__(self, path: str, interval: float = POLL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self.swaps = 0
+        self.last_error: Optional[str] = None
+        self._seen: Optional[Tuple[float, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def load(self) -> bool:
+        """
+        Load, validate and compile the file now and swap it in. Raises
+        OSError/ValueError and keeps the current state if the file is bad.
+        True if the policy changed.
+        """
+        self._seen = self._stat()
+        state = compile_ir_state(load_policy_file(self.path), source=self.path)
+        self.last_error = None
+
+        current = ir_model.current_state()
+        if (state.version, state.source) == (current.version, current.source):
+            return False  # touched but unchanged
+        swap_state(state)
+        self.swaps += 1
+        logger.info("industry policy %s loaded from %s (%d industries)", state.version, self.path, len(state.table))
+        return True
+
+    def check(self) -> bool:
+        """
+        Reload if the file's mtime or size changed since the last load.
+        True if a new state was swapped in.
+        """
+        stat = self._stat()
+        if stat is None:
+            if self.last_error is None:
+                self.last_error = f"{self.path} is missing; keeping the current policy"
+                logger.warning(self.last_error)
+            return False
+        if stat == self._seen:
+            return False
+        try:
+            return self.load()
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            logger.error("industry policy %s rejected, keeping version %s: %s",
+                         self.path, ir_model.current_state().version, e)
+            return False
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="policy-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:  # never let the watcher die
+                logger.exception("industry policy watcher failed")
+
+    def status(self) -> Dict[str, Any]:
+        state = ir_model.current_state()
+        return {
+            "file": self.path,
+            "version": state.version,
+            "source": state.source,
+            "industries": len(state.table),
+            "loaded_at": state.loaded_at,
+            "swaps": self.swaps,
+            "last_error": self.last_error,
+            "poll_seconds": self.interval,
+            "watching": self._thread is not None
+        }
+
+
+def policy_status(watcher: Optional[PolicyWatcher]) -> Dict[str, Any]:
+    """
+    Current policy version and, when a file is watched, the watcher's state.
+    """
+    if watcher is not None:
+        return watcher.status()
+    state = ir_model.current_state()
+    return {
+        "file": None,
+        "version": state.version,
+        "source": state.source,
+        "industries": len(state.table),
+        "loaded_at": state.loaded_at
+    }
@@ -0,0 +1,122 @@
+# precompressed.py
+# Responses served from bytes that were serialized and compressed ahead of time.
+#
+# A PrecompressedBody holds one payload as identity, gzip and (when the
+# optional brotli package is installed) br bytes, each with its own strong
+# ETag. PrecompressedCache rebuilds the body only when its source object is
+# replaced, so steady-state requests do no encoding or compression at all.
+import gzip
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from fr_cache import if_none_match
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# preferred first when the client accepts several with equal weight
+_PREFERENCE = ("br", "gzip", "identity")
+
+
+def _accepted(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """
+    Accept-Encoding as {coding: q}. identity is acceptable unless refused.
+    """
+    weights: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    star = weights.pop("*", None)
+    if star is not None:
+        for coding in _PREFERENCE:
+            weights.setdefault(coding, star)
+    weights.setdefault("identity", 0.001)
+    return weights
+
+
+class PrecompressedBody:
+    def __init__(self, content: bytes, media_type: str = "application/json"):
+        self.media_type = media_type
+        digest = hashlib.sha256(content).hexdigest()[:32]
+
+        encoded = {"identity": content, "gzip": gzip.compress(content, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+
+        # coding -> (bytes, strong ETag); the ETag differs per coding since the bytes do
+        self.variants: Dict[str, Tuple[bytes, str]] = {
+            coding: (data, f'"{digest}-{coding}"') for coding, data in encoded.items()
+        }
+
+    def choose(self, accept_encoding: Optional[str]) -> str:
+        weights = _accepted(accept_encoding)
+        best = max(
+            (c for c in _PREFERENCE if c in self.variants and weights.get(c, 0) > 0),
+            key=lambda c: weights[c],
+            default="identity"
+        )
+        return best
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """
+        The variant the client accepts best, or 304 when its ETag matches.
+        """
+        coding = self.choose(request.headers.get("accept-encoding"))
+        body, etag = self.variants[coding]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": cache_control}
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+
+class PrecompressedCache:
+    """
+    PrecompressedBody of render(source), rebuilt whenever source() returns a
+    different object than at the last build. render gets that same object,
+    so the bytes always belong to the source they are cached against.
+    """
+
+    def __init__(self, source: Callable[[], object], render: Callable[[object], bytes],
+                 media_type: str = "application/json"):
+        self._source = source
+        self._render = render
+        self._media_type = media_type
+        self._built: Optional[Tuple[object, PrecompressedBody]] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self) -> PrecompressedBody:
+        built = self._built
+        source = self._source()
+        if built is not None and built[0] is source:
+            return built[1]
+        with self._lock:
+            built = self._built
+            if built is None or built[0] is not source:
+                built = (source, PrecompressedBody(self._render(source), self._media_type))
+                self._built = built
+                self.builds += 1
+        return built[1]
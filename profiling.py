@@ -0,0 +1,61 @@
+# profiling.py
+# Opt-in cProfile run of a single request.
+#
+# Disabled unless PROFILE_SECRET is set. A request carrying
+#   X-Profile: <PROFILE_SECRET>
+# is scored under cProfile; the raw stats (<id>.prof, for snakeviz/pstats) and a
+# text summary (<id>.txt) are written to PROFILE_DIR and the id is returned in
+# the X-Profile-Id response header. Requests without the header never touch this.
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import tempfile
+import uuid
+from typing import Any, Callable, Optional, Tuple
+
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "engine-profiles"))
+
+# rows in the text summary
+SUMMARY_ROWS = 40
+
+
+def profile_authorized(header: Optional[str]) -> bool:
+    """
+    True if the X-Profile header value matches the configured secret.
+    Always False while PROFILE_SECRET is unset.
+    """
+    if not PROFILE_SECRET or header is None:
+        return False
+    return hmac.compare_digest(header.encode(), PROFILE_SECRET.encode())
+
+
+def run_profiled(fn: Callable[..., Any], *args: Any) -> Tuple[Any, str]:
+    """
+    Call fn(*args) under cProfile in the current thread and write the
+    profile to PROFILE_DIR. Returns (result, profile_id).
+    The profile is written even if fn raises.
+    """
+    profile_id = uuid.uuid4().hex
+    profiler = cProfile.Profile()
+    try:
+        result = profiler.runcall(fn, *args)
+    finally:
+        _write(profiler, profile_id)
+    return result, profile_id
+
+
+def _write(profiler: cProfile.Profile, profile_id: str) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, profile_id)
+    profiler.dump_stats(base + ".prof")
+
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(SUMMARY_ROWS)
+    with open(base + ".txt", "w") as f:
+        f.write(out.getvalue())
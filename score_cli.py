@@ -0,0 +1,150 @@
+# score_cli.py
+# Offline batch scorer: CSV/Parquet in, NDJSON out, no HTTP.
+#
+#   python score_cli.py coa borrowers.csv scores.ndjson
+#   python score_cli.py fr statements.parquet fr.ndjson --workers 8 --resume
+#
+# Input columns per kind:
+#   coa / soa : one column per input code (same names as the API fields); other columns are ignored
+#   ir        : "industry"
+#   fr        : "<year>::<metric>", e.g. "2023::Net Sales", for every year and metric
+# An optional "id" column is copied to the output; otherwise the row number is used.
+#
+# Output is written in input order, so the number of complete lines in the
+# output file is the checkpoint: --resume skips that many input rows.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from coa_logic import WEIGHTS as COA_FIELDS, calculate_coa_score
+from soa_logic import WEIGHTS as SOA_FIELDS, calculate_soa_score
+from ir_model import calculate_ir
+from fr_logic import calculate_fr_score
+
+
+FR_COLUMN_SEP = "::"
+
+
+# 1. ROW -> SCORE
+
+def _codes(row: Dict[str, Any], fields: Iterable[str]) -> Dict[str, int]:
+    # only the scorecard's own columns; a missing one is reported by the scorer
+    return {f: int(row[f]) for f in fields if row.get(f) not in ("", None)}
+
+
+def _fr_payload(row: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    payload: Dict[str, Dict[str, float]] = {}
+    for column, value in row.items():
+        if FR_COLUMN_SEP not in column or value in ("", None):
+            continue
+        year, metric = column.split(FR_COLUMN_SEP, 1)
+        payload.setdefault(year, {})[metric] = float(value)
+    return payload
+
+
+SCORERS = {
+    "coa": lambda row: {"coa_score": calculate_coa_score(_codes(row, COA_FIELDS))},
+    "soa": lambda row: {"soa_score": calculate_soa_score(_codes(row, SOA_FIELDS))},
+    "ir": lambda row: {"ir_score": calculate_ir(row["industry"])["ir_score"]},
+    "fr": lambda row: calculate_fr_score(_fr_payload(row)),
+}
+
+
+def _score_row(task: Tuple[str, int, Dict[str, Any]]) -> str:
+    kind, row_number, row = task
+    row_id = row.get("id", row_number)
+    try:
+        out = {"id": row_id, "result": SCORERS[kind](row)}
+    except Exception as e:
+        out = {"id": row_id, "error": str(e) or type(e).__name__}
+    return json.dumps(out) + "\n"
+
+
+# 2. INPUT / OUTPUT
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from a CSV file, or from Parquet when pyarrow is installed.
+    """
+    if path.lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def completed_rows(path: str) -> int:
+    """
+    Count complete lines in an existing output file, dropping a partial
+    last line left behind by a crash.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+    return data.count(b"\n", 0, end)
+
+
+# 3. DRIVER
+
+def run(kind: str, input_path: str, output_path: str, workers: int, chunksize: int,
+        resume: bool, report_every: float = 5.0) -> int:
+    skip = completed_rows(output_path) if resume else 0
+    tasks = ((kind, n, row) for n, row in islice(enumerate(read_rows(input_path)), skip, None))
+
+    # Pool.imap drains its input eagerly, so feed it a bounded window at a time
+    window = max(1, workers * chunksize * 4)
+
+    done = 0
+    start = last_report = time.perf_counter()
+    with open(output_path, "a" if resume else "w") as out, Pool(workers) as pool:
+        while True:
+            batch = list(islice(tasks, window))
+            if not batch:
+                break
+            # imap keeps input order, which is what makes the line count a valid checkpoint
+            for line in pool.imap(_score_row, batch, chunksize=chunksize):
+                out.write(line)
+                done += 1
+            out.flush()
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                print(f"{skip + done} rows, {done / (now - start):,.0f} rows/s", file=sys.stderr)
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"done: {done} rows scored ({skip} skipped) in {elapsed:.2f}s, {rate:,.0f} rows/s", file=sys.stderr)
+    return done
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Score borrower files offline with the engine's scorecards.")
+    parser.add_argument("kind", choices=sorted(SCORERS))
+    parser.add_argument("input", help="CSV or Parquet file of borrower inputs")
+    parser.add_argument("output", help="NDJSON results file, one line per input row")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=500, help="rows per task sent to a worker")
+    parser.add_argument("--resume", action="store_true", help="continue after the rows already in OUTPUT")
+    args = parser.parse_args(argv)
+
+    run(args.kind, args.input, args.output, args.workers, args.chunksize, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+# scorecard.py
+# Declarative scorecards compiled into specialized scoring functions.
+#
+# A scorecard lists its fields in scoring order, each with a weight and either
+# a code -> points table or numeric bands:
+#
+#   {
+#       "name": "coa",
+#       "round": 0,   # round(total) -> int; n -> round(total, n); None -> unrounded
+#       "fields": {
+#           "write_off": {"weight": 0.2, "points": {1: 600, 2: 0}},
+#           "DSCR": {"weight": 0.15, "bands": [(2.5, 600), (2.0, 400)], "higher_is_better": True},
+#       }
+#   }
+#
+# compile_scorecard() turns that into straight-line Python: every table,
+# bound and weight is inlined as a literal, band lookups become if/elif
+# ladders, and there are no loops or dict walks over the spec at call time.
+# score_batch scores many rows at once: row dicts through the generated
+# score(), columns through a numpy variant of the same card.
+# Both add up points * weight field by field, in the order given, so their
+# totals are bit-identical to a hand-written loop over the same fields.
+#
+# ScoreSpace goes one step further for points-only cards: every input
+# combination is scored once and a score becomes a single table read.
+import itertools
+import linecache
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_codes import code_at, compile_lookup, to_code_matrix
+
+
+def _is_number(value: Any) -> bool:
+    # finite int or float; weights, bounds and band points are inlined as literals
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class ScorecardField:
+    __slots__ = ("name", "weight", "points", "bands", "higher_is_better")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.weight = float(spec["weight"])
+        if not math.isfinite(self.weight):
+            raise ValueError(f"Scorecard field '{name}' has a non-finite weight")
+        self.points: Optional[Dict[Any, Any]] = spec.get("points")
+        self.bands: Optional[List[Tuple[float, Any]]] = None
+        self.higher_is_better = bool(spec.get("higher_is_better", True))
+
+        if "bands" in spec:
+            self.bands = sorted((float(b), s) for b, s in spec["bands"])
+        if (self.points is None) == (self.bands is None):
+            raise ValueError(f"Scorecard field '{name}' needs exactly one of 'points' or 'bands'")
+        if self.points is not None and not self.points:
+            raise ValueError(f"Scorecard field '{name}' has an empty points table")
+
+        # codes index the numpy lookup tables: a negative one would wrap around
+        for code, points in (self.points or {}).items():
+            if not isinstance(code, int) or isinstance(code, bool) or code < 0:
+                raise ValueError(f"Scorecard field '{name}': code {code!r} is not a non-negative integer")
+            if not _is_number(points):
+                raise ValueError(f"Scorecard field '{name}': points {points!r} for code {code} are not a finite number")
+        for bound, points in self.bands or ():
+            if not math.isfinite(bound):
+                raise ValueError(f"Scorecard field '{name}': band bound {bound!r} is not finite")
+            if not _is_number(points):
+                raise ValueError(f"Scorecard field '{name}': band points {points!r} are not a finite number")
+
+    def ladder(self) -> List[Tuple[str, float, Any]]:
+        """
+        (operator, bound, score) tests in evaluation order; first hit wins, else 0.
+        Bounds are inclusive, as in fr_logic.band_index.
+        """
+        if self.higher_is_better:
+            return [(">=", b, s) for b, s in reversed(self.bands)]
+        return [("<=", b, s) for b, s in self.bands]
+
+
+def round_scalar(values: Any, digits: int) -> np.ndarray:
+    """
+    round(x, digits) for every element, bit-identical to Python's round().
+    np.round scales by 10**digits first and can land on the other side of a
+    decimal tie (0.1495 -> 0.15 where round() gives 0.149), so elements near a
+    tie, and large ones, are re-rounded with round().
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.round(values, digits)
+    with np.errstate(invalid="ignore"):
+        scaled = np.abs(values) * 10.0 ** digits
+        # the scaled value's own error stays below 1e-6 while it is under 2**30
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        redo = np.flatnonzero(near_tie | (scaled >= 2.0 ** 30))
+    if len(redo):
+        flat = result.reshape(-1)
+        flat[redo] = [round(x, digits) for x in values.reshape(-1)[redo].tolist()]
+    return result
+
+
+# ---------- code generation ----------
+
+def _ladder_lines(field: ScorecardField, value: str, target: str, indent: str) -> List[str]:
+    lines = []
+    for i, (op, bound, score) in enumerate(field.ladder()):
+        keyword = "if" if i == 0 else "elif"
+        lines.append(f"{indent}{keyword} {value} {op} {bound!r}:")
+        lines.append(f"{indent}    {target} = {score!r}")
+    lines.append(f"{indent}else:")
+    lines.append(f"{indent}    {target} = 0")
+    return lines
+
+
+def generate_source(name: str, fields: Sequence[ScorecardField], round_digits: Optional[int]) -> str:
+    """
+    Python source of score(inputs), points(inputs) and one band_<i>(value)
+    function per banded field. Points tables are referenced as _t<i>.
+    """
+    lookups = []
+    for i, f in enumerate(fields):
+        if f.points is not None:
+            lookups.append(f"        p{i} = _t{i}[inputs[{f.name!r}]]")
+        else:
+            lookups.append(f"        v{i} = inputs[{f.name!r}]")
+    bands = []
+    for i, f in enumerate(fields):
+        if f.bands is not None:
+            bands += _ladder_lines(f, f"v{i}", f"p{i}", "    ")
+
+    body = [
+        "    try:",
+        *lookups,
+        "    except KeyError:",
+        "        raise _invalid(inputs) from None",
+        *bands,
+    ]
+
+    if round_digits is None:
+        result = ["    return total"]
+    elif round_digits == 0:
+        result = ["    return round(total)"]
+    else:
+        # round(total, n) through dtoa is the slowest step; away from a decimal
+        # tie (and from zero, for its sign) round(total * 10**n) / 10**n is the
+        # same float: |total| < 2**40 keeps the product's error below 1e-4
+        scale = 10 ** round_digits
+        limit = float(2 ** 40)
+        result = [
+            f"    y = total * {float(scale)!r}",
+            f"    if -{limit!r} < y < {limit!r}:",
+            "        k = round(y)",
+            "        d = y - k",
+            "        if k and -0.49 < d < 0.49:",
+            f"            return k / {scale}",
+            f"    return round(total, {round_digits})",
+        ]
+
+    lines = [f"# generated scorecard: {name}", "", "def score(inputs):", *body, "    total = 0"]
+    lines += [f"    total += p{i} * {f.weight!r}" for i, f in enumerate(fields)]
+    lines += [*result, "", "", "def points(inputs):", *body]
+    lines += [f"    return ({', '.join(f'p{i}' for i in range(len(fields)))},)"]
+
+    for i, f in enumerate(fields):
+        if f.bands is not None:
+            lines += ["", "", f"def band_{i}(value):"]
+            lines += _ladder_lines(f, "value", "score", "    ")
+            lines += ["    return score"]
+    return "\n".join(lines) + "\n"
+
+
+# ---------- compiled scorecard ----------
+
+class Scorecard:
+    """
+    Compiled form of one declarative scorecard.
+
+    score(inputs)       weighted, rounded total; ValueError on a missing field or bad code
+    points(inputs)      raw points per field, in field order
+    band(field, value)  points of one banded field (0 for NaN)
+    score_batch(...)    many rows: score() per row dict, numpy for columns
+    band_scores / weighted_total
+                        the numpy building blocks, for callers with their own arrays
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name: str = spec["name"]
+        self.round_digits: Optional[int] = spec.get("round")
+        if self.round_digits is not None and (
+            not isinstance(self.round_digits, int) or isinstance(self.round_digits, bool) or self.round_digits < 0
+        ):
+            raise ValueError(f"Scorecard '{self.name}': round must be None or a non-negative integer")
+        self.fields: Tuple[ScorecardField, ...] = tuple(
+            ScorecardField(name, f) for name, f in spec["fields"].items()
+        )
+        if not self.fields:
+            raise ValueError(f"Scorecard '{self.name}' has no fields")
+        self.field_names: Tuple[str, ...] = tuple(f.name for f in self.fields)
+
+        self.source = generate_source(self.name, self.fields, self.round_digits)
+        namespace: Dict[str, Any] = {"_invalid": self._invalid}
+        for i, f in enumerate(self.fields):
+            if f.points is not None:
+                namespace[f"_t{i}"] = dict(f.points)
+
+        filename = f"<scorecard {self.name}>"
+        # register the source so tracebacks and profilers can show generated lines
+        linecache.cache[filename] = (len(self.source), None, self.source.splitlines(True), filename)
+        exec(compile(self.source, filename, "exec"), namespace)
+
+        self.score: Callable[[Dict[str, Any]], Any] = namespace["score"]
+        self.points: Callable[[Dict[str, Any]], Tuple[Any, ...]] = namespace["points"]
+        self.band_functions: Dict[str, Callable[[float], Any]] = {
+            f.name: namespace[f"band_{i}"] for i, f in enumerate(self.fields) if f.bands is not None
+        }
+
+        # numpy variant: points fields as arrays indexed by code, bands for searchsorted
+        self._tables = [
+            np.concatenate(([np.nan], compile_lookup(f.points), [np.nan])) if f.points is not None
+            else (np.array([b for b, _ in f.bands]),
+                  np.array([0] + [s for _, s in f.bands]) if f.higher_is_better
+                  else np.array([s for _, s in f.bands] + [0]),
+                  "right" if f.higher_is_better else "left")
+            for f in self.fields
+        ]
+        self._weights = np.array([f.weight for f in self.fields])
+        self._positions = {f.name: i for i, f in enumerate(self.fields)}
+
+    def _invalid(self, inputs: Dict[str, Any]) -> ValueError:
+        # first failing field in scoring order, with the hand-written scorers' messages
+        for f in self.fields:
+            if f.name not in inputs:
+                return ValueError(f"Missing field: {f.name}")
+            if f.points is not None and inputs[f.name] not in f.points:
+                return ValueError(f"Invalid code {inputs[f.name]} for {f.name}")
+        return ValueError(f"Invalid input for scorecard '{self.name}'")
+
+    def band(self, field: str, value: float) -> Any:
+        return self.band_functions[field](value)
+
+    def row_error(self, row: Dict[str, Any]) -> str:
+        """
+        Batch error message for a row score() rejected. Unlike score(), a
+        field set to None counts as missing, as it does in columns.
+        """
+        for f in self.fields:
+            value = row.get(f.name)
+            if value is None:
+                return f"Missing field: {f.name}"
+            if f.points is not None and value not in f.points:
+                return f"Invalid code {value} for {f.name}"
+            if f.points is None and not isinstance(value, (int, float)):
+                return f"Invalid value {value!r} for {f.name}"
+        return f"Invalid input for scorecard '{self.name}'"
+
+    # ---------- vectorized ----------
+
+    def band_scores(self, field: str, values: Any) -> np.ndarray:
+        """
+        band() for an array of values of one banded field. NaN scores 0.
+        """
+        bounds, scores, side = self._tables[self._positions[field]]
+        values = np.asarray(values, dtype=float)
+        points = scores[np.searchsorted(bounds, values, side=side)]
+        nan = np.isnan(values)
+        if nan.any():
+            points = np.where(nan, 0, points)
+        return points
+
+    def weighted_total(self, points: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Unrounded totals from one points array per field, in field order.
+        Adds points * weight field by field, the same float operations as score().
+        """
+        total = np.zeros(len(points[0]))
+        for column, weight in zip(points, self._weights):
+            total += column * weight
+        return total
+
+    def score_matrix(
+        self,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        columns: Optional[Dict[str, List[Any]]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Unrounded totals for many rows given as row dicts or equal-length columns.
+        Returns (totals, ok, errors): ok marks rows where every field resolved,
+        errors holds the first bad field per row.
+        """
+        if (rows is None) == (columns is None):
+            raise ValueError("Provide exactly one of 'rows' or 'columns'")
+        code_fields = [f.name for f in self.fields if f.points is not None]
+        codes, present = to_code_matrix(code_fields, rows=rows, columns=columns)
+        code_col = {name: j for j, name in enumerate(code_fields)}
+        n = codes.shape[0] if code_fields else (len(rows) if rows is not None else
+                                                 len(next(iter(columns.values()), [])))
+
+        ok = np.ones(n, dtype=bool)
+        errors: List[Dict[str, Any]] = []
+        points = []
+        all_present = bool(present.all())
+
+        for f, table in zip(self.fields, self._tables):
+            if f.points is not None:
+                j = code_col[f.name]
+                col, has = codes[:, j], present[:, j]
+                # table padded with NaN on both sides: out-of-range codes clip onto a NaN
+                index = col + 1
+                np.maximum(index, 0, out=index)
+                np.minimum(index, len(table) - 1, out=index)
+                raw = table[index]
+                valid = ~np.isnan(raw)
+                if not all_present:
+                    valid &= has
+            else:
+                values = [row.get(f.name) for row in rows] if rows is not None else columns.get(f.name, [None] * n)
+                col = np.asarray(values, dtype=float)  # None -> NaN
+                raw = self.band_scores(f.name, col)
+                # NaN scores 0 like get_score; only None counts as missing
+                valid = has = np.ones(n, dtype=bool)
+                nan = np.flatnonzero(np.isnan(col))
+                if len(nan):
+                    has[nan] = [values[i] is not None for i in nan.tolist()]
+
+            if not valid.all():
+                for i in np.flatnonzero(ok & ~valid).tolist():
+                    if has[i]:
+                        code = code_at(f.name, i, rows, columns)
+                        errors.append({"index": i, "error": f"Invalid code {code} for {f.name}"})
+                    else:
+                        errors.append({"index": i, "error": f"Missing field: {f.name}"})
+                ok &= valid
+            points.append(raw)
+
+        errors.sort(key=lambda e: e["index"])
+        total = self.weighted_total(points) if points else np.zeros(n)
+        return total, ok, errors
+
+    def score_batch(
+        self,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        columns: Optional[Dict[str, List[Any]]] = None,
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        score() for many rows: (scores with None for invalid rows, errors).
+        Row dicts go through the generated score() one by one, which beats
+        building column arrays from them; columns take the numpy path.
+        """
+        if rows is not None and columns is None:
+            return score_rows(self, self.score, rows)
+
+        totals, ok, errors = self.score_matrix(rows=rows, columns=columns)
+        if self.round_digits == 0:
+            # np.rint rounds half to even, like round(x)
+            scores = [int(t) if valid else None for t, valid in zip(np.rint(totals).tolist(), ok.tolist())]
+        elif self.round_digits is None:
+            scores = [t if valid else None for t, valid in zip(totals.tolist(), ok.tolist())]
+        else:
+            rounded = round_scalar(totals, self.round_digits)
+            scores = [t if valid else None for t, valid in zip(rounded.tolist(), ok.tolist())]
+        return scores, errors
+
+
+def score_rows(
+    card: Scorecard, score: Callable[[Dict[str, Any]], Any], rows: List[Dict[str, Any]]
+) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    score_batch for row dicts: `score` per row, a None score and an error for rows it rejects.
+    """
+    scores: List[Any] = []
+    errors: List[Dict[str, Any]] = []
+    append = scores.append
+    for i, row in enumerate(rows):
+        try:
+            append(score(row))
+        except (ValueError, TypeError):
+            append(None)
+            errors.append({"index": i, "error": card.row_error(row)})
+    return scores, errors
+
+
+def compile_scorecard(spec: Dict[str, Any]) -> Scorecard:
+    """
+    Validate a declarative scorecard and compile it. Raises ValueError.
+    """
+    try:
+        return Scorecard(spec)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid scorecard spec '{spec.get('name', '?')}': {e}")
+
+
+# ---------- precomputed score space ----------
+
+class ScoreSpace:
+    """
+    Every score of a points-only scorecard, computed once with card.score
+    and stored in a flat table indexed by the mixed-radix encoding of the
+    codes (first field most significant, codes in ascending order).
+
+    score(inputs)       one index computation and one table read
+    score_batch(...)    the same for many rows, errors as Scorecard.score_batch
+    distribution()      the whole space: table layout, every score, counts
+    """
+
+    def __init__(self, card: Scorecard):
+        if any(f.points is None for f in card.fields):
+            raise ValueError(f"Scorecard '{card.name}' has banded fields; only points tables can be enumerated")
+        self.card = card
+        self.codes: Tuple[Tuple[Any, ...], ...] = tuple(tuple(sorted(f.points)) for f in card.fields)
+        self.radix: Tuple[int, ...] = tuple(len(c) for c in self.codes)
+        strides = []
+        stride = 1
+        for r in reversed(self.radix):
+            strides.append(stride)
+            stride *= r
+        self.strides: Tuple[int, ...] = tuple(reversed(strides))
+        self.size = stride
+
+        # code -> digit * stride, so the index is a plain sum of lookups
+        self._offsets = [
+            {code: d * s for d, code in enumerate(codes)} for codes, s in zip(self.codes, self.strides)
+        ]
+        self.table: List[Any] = [
+            card.score(dict(zip(card.field_names, combo))) for combo in itertools.product(*self.codes)
+        ]
+
+        terms = " + ".join(f"_o{i}[inputs[{name!r}]]" for i, name in enumerate(card.field_names))
+        self.source = "\n".join([
+            f"# precomputed score space: {card.name}",
+            "",
+            "def score(inputs):",
+            "    try:",
+            f"        i = {terms}",
+            "    except KeyError:",
+            "        raise _invalid(inputs) from None",
+            "    return _table[i]",
+        ]) + "\n"
+        namespace: Dict[str, Any] = {"_invalid": card._invalid, "_table": self.table}
+        for i, offsets in enumerate(self._offsets):
+            namespace[f"_o{i}"] = offsets
+        filename = f"<score space {card.name}>"
+        linecache.cache[filename] = (len(self.source), None, self.source.splitlines(True), filename)
+        exec(compile(self.source, filename, "exec"), namespace)
+        self.score: Callable[[Dict[str, Any]], Any] = namespace["score"]
+
+        # numpy variant: code -> offset arrays, -1 for codes outside the table
+        self._offset_arrays = []
+        for offsets in self._offsets:
+            arr = np.full(max(offsets) + 1, -1, dtype=np.int64)
+            for code, offset in offsets.items():
+                arr[code] = offset
+            self._offset_arrays.append(arr)
+
+    def index(self, inputs: Dict[str, Any]) -> int:
+        """
+        Table position of one row's codes. Raises ValueError like score().
+        """
+        try:
+            return sum(o[inputs[name]] for o, name in zip(self._offsets, self.card.field_names))
+        except KeyError:
+            raise self.card._invalid(inputs) from None
+
+    def score_batch(
+        self,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        columns: Optional[Dict[str, List[Any]]] = None,
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        score() for many rows: (scores with None for invalid rows, errors).
+        """
+        if rows is not None and columns is None:
+            return score_rows(self.card, self.score, rows)
+
+        codes, present = to_code_matrix(self.card.field_names, rows=rows, columns=columns)
+        n = codes.shape[0]
+        index = np.zeros(n, dtype=np.int64)
+        ok = np.ones(n, dtype=bool)
+        errors: List[Dict[str, Any]] = []
+
+        for j, (name, offsets) in enumerate(zip(self.card.field_names, self._offset_arrays)):
+            col, has = codes[:, j], present[:, j]
+            in_range = has & (col >= 0) & (col < len(offsets))
+            offset = offsets[np.where(in_range, col, 0)]
+            valid = in_range & (offset >= 0)
+            for i in np.flatnonzero(ok & ~valid).tolist():
+                if has[i]:
+                    errors.append({"index": i, "error": f"Invalid code {code_at(name, i, rows, columns)} for {name}"})
+                else:
+                    errors.append({"index": i, "error": f"Missing field: {name}"})
+            ok &= valid
+            index += np.where(valid, offset, 0)
+
+        errors.sort(key=lambda e: e["index"])
+        table = self.table
+        return [table[i] if valid else None for i, valid in zip(index.tolist(), ok.tolist())], errors
+
+    def distribution(self) -> Dict[str, Any]:
+        """
+        The full score space: field layout, the table in index order and
+        the count of combinations per distinct score.
+        """
+        counts: Dict[Any, int] = {}
+        for s in self.table:
+            counts[s] = counts.get(s, 0) + 1
+        return {
+            "scorecard": self.card.name,
+            "combinations": self.size,
+            "fields": [
+                {"name": f.name, "weight": f.weight, "codes": list(codes), "stride": stride}
+                for f, codes, stride in zip(self.card.fields, self.codes, self.strides)
+            ],
+            "min": min(self.table),
+            "max": max(self.table),
+            "mean": round(sum(self.table) / self.size, 3),
+            "distribution": [{"score": s, "count": counts[s]} for s in sorted(counts)],
+            # scores[sum(codes.index(code) * stride)] per field
+            "scores": self.table,
+        }
@@ -0,0 +1,234 @@
+# scoring_policy.py
+# Named scoring policy versions (weights and FR bands) held side by side.
+#
+# "production" is always the weights and rules in coa_logic, soa_logic,
+# fr_logic and ir_model. Other versions, e.g. a challenger under review, come
+# from SCORING_POLICIES_FILE (JSON, or YAML with PyYAML):
+#
+#   {
+#     "default": "production",
+#     "policies": {
+#       "candidate": {
+#         "coa_weights": {"write_off": 0.25, "fraud_litigation": 0.15},
+#         "soa_weights": {...}, "fr_weights": {...},
+#         "fr_rules": {"DSCR": [[2.75, 600], [2.25, 500], [1.5, 300]]},
+#         "ir_factor_weight": 0.07,
+#         "composite_weights": {"fr": 0.4, "ir": 0.1}
+#       }
+#     }
+#   }
+#
+# A version lists only what differs from production. Each is compiled once into
+# its own weight vectors and band tables. The score_* functions read and
+# validate inputs and compute the policy-independent parts (raw points, ratios)
+# once, then apply every requested policy to that shared work.
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import coa_logic
+import soa_logic
+from fr_logic import (
+    APARFinancialModel, BANDS, BandTable, LOWER_IS_BETTER_RULES, RULES, WEIGHTS as FR_WEIGHTS,
+    compile_bands, score_vectors, window_vectors
+)
+from ir_model import FACTOR_WEIGHT, IRState, calculate_ir
+from policy_reload import load_policy_file
+
+
+PRODUCTION = "production"
+COMPONENTS = ("coa", "soa", "ir", "fr")
+
+_SPEC_KEYS = {"coa_weights", "soa_weights", "fr_weights", "fr_rules", "ir_factor_weight", "composite_weights"}
+
+
+class ScoringPolicy(NamedTuple):
+    name: str
+    coa_weights: Dict[str, float]
+    soa_weights: Dict[str, float]
+    fr_weights: Dict[str, float]
+    fr_bands: Dict[str, BandTable]
+    ir_factor_weight: float
+    composite_weights: Dict[str, float]  # overrides of composite_logic.COMPOSITE_WEIGHTS
+    fr_fingerprint: str                  # hash of fr_weights and fr_bands, for FR cache keys and ETags
+
+
+# ---------- compiling ----------
+
+def _weights(label: str, base: Dict[str, float], overrides: Any) -> Dict[str, float]:
+    if overrides is None:
+        return base
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{label} must be a mapping")
+    unknown = set(overrides) - set(base)
+    if unknown:
+        raise ValueError(f"{label}: unknown field(s) {', '.join(sorted(unknown))}")
+    merged = {**base, **{k: float(v) for k, v in overrides.items()}}
+    if any(w < 0 for w in merged.values()):
+        raise ValueError(f"{label} must be non-negative")
+    return merged
+
+
+def _bands(overrides: Any) -> Dict[str, BandTable]:
+    if overrides is None:
+        return BANDS
+    if not isinstance(overrides, dict):
+        raise ValueError("fr_rules must be a mapping of metric -> [[bound, score], ...]")
+    bands = dict(BANDS)
+    for metric, rules in overrides.items():
+        if metric in RULES:
+            higher_is_better = True
+        elif metric in LOWER_IS_BETTER_RULES:
+            higher_is_better = False
+        else:
+            raise ValueError(f"fr_rules: unknown metric '{metric}'")
+        try:
+            pairs = [(float(bound), int(score)) for bound, score in rules]
+        except (TypeError, ValueError):
+            raise ValueError(f"fr_rules['{metric}'] must be a list of [bound, score] pairs")
+        if not pairs:
+            raise ValueError(f"fr_rules['{metric}'] is empty")
+        bands[metric] = compile_bands(pairs, higher_is_better)
+    return bands
+
+
+def fr_fingerprint(weights: Dict[str, float], bands: Dict[str, BandTable]) -> str:
+    """
+    Short content hash of the FR weights and bands; changes whenever FR scores can.
+    """
+    content = json.dumps(
+        {"weights": weights, "bands": {m: [t.bounds, t.scores, t.higher_is_better] for m, t in bands.items()}},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def compile_policy(name: str, spec: Optional[Dict[str, Any]] = None) -> ScoringPolicy:
+    """
+    Production weights and rules with the overrides in `spec` applied.
+    Raises ValueError on unknown keys, fields or metrics.
+    """
+    spec = spec or {}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Policy '{name}' must be a mapping")
+    unknown = set(spec) - _SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Policy '{name}': unknown key(s) {', '.join(sorted(unknown))}")
+
+    try:
+        ir_factor_weight = float(spec.get("ir_factor_weight", FACTOR_WEIGHT))
+        composite = _weights("composite_weights", dict.fromkeys(COMPONENTS, 0.0), spec.get("composite_weights"))
+        fr_weights = _weights("fr_weights", FR_WEIGHTS, spec.get("fr_weights"))
+        fr_bands = _bands(spec.get("fr_rules"))
+        return ScoringPolicy(
+            name=name,
+            coa_weights=_weights("coa_weights", coa_logic.WEIGHTS, spec.get("coa_weights")),
+            soa_weights=_weights("soa_weights", soa_logic.WEIGHTS, spec.get("soa_weights")),
+            fr_weights=fr_weights,
+            fr_bands=fr_bands,
+            ir_factor_weight=ir_factor_weight,
+            composite_weights={k: composite[k] for k in (spec.get("composite_weights") or {})},
+            fr_fingerprint=fr_fingerprint(fr_weights, fr_bands)
+        )
+    except ValueError as e:
+        raise ValueError(f"Policy '{name}': {e}")
+
+
+def load_policies(path: Optional[str]) -> Tuple[Dict[str, ScoringPolicy], str]:
+    """
+    Compile production plus every version in `path`. Returns (policies, default name).
+    """
+    policies = {PRODUCTION: compile_policy(PRODUCTION)}
+    if not path:
+        return policies, PRODUCTION
+
+    data = load_policy_file(path)
+    if not isinstance(data, dict) or not isinstance(data.get("policies", {}), dict):
+        raise ValueError(f"{path}: expected {{'default': name, 'policies': {{name: spec}}}}")
+    for name, spec in data.get("policies", {}).items():
+        if name == PRODUCTION:
+            raise ValueError(f"{path}: '{PRODUCTION}' is defined by the code and cannot be redefined")
+        policies[name] = compile_policy(name, spec)
+
+    default = data.get("default", PRODUCTION)
+    if default not in policies:
+        raise ValueError(f"{path}: default policy '{default}' is not defined")
+    return policies, default
+
+
+# loaded once at import; a bad file fails startup
+POLICIES, DEFAULT_POLICY = load_policies(os.environ.get("SCORING_POLICIES_FILE"))
+
+
+def get_policy(name: Optional[str] = None) -> ScoringPolicy:
+    """
+    The named policy, or the default one. Raises ValueError for unknown names.
+    """
+    policy = POLICIES.get(name or DEFAULT_POLICY)
+    if policy is None:
+        raise ValueError(f"Unknown scoring policy '{name}'; available: {', '.join(POLICIES)}")
+    return policy
+
+
+# ---------- scoring under several policies ----------
+
+def score_coa(input_codes: Dict[str, int], policies: Sequence[ScoringPolicy]) -> List[int]:
+    """
+    calculate_coa_score once per policy; codes are looked up once by the compiled card.
+    """
+    points = list(zip(coa_logic.COA_SCORECARD.field_names, coa_logic.COA_SCORECARD.points(input_codes)))
+
+    scores = []
+    for policy in policies:
+        total = 0
+        for field, raw in points:
+            total += raw * policy.coa_weights[field]
+        scores.append(round(total))
+    return scores
+
+
+def score_soa(inputs: Dict[str, int], policies: Sequence[ScoringPolicy]) -> List[float]:
+    """
+    calculate_soa_score once per policy; codes are looked up once by the compiled card.
+    """
+    points = list(zip(soa_logic.SOA_SCORECARD.field_names, soa_logic.SOA_SCORECARD.points(inputs)))
+
+    scores = []
+    for policy in policies:
+        total = 0
+        for field, raw in points:
+            total += raw * policy.soa_weights[field]
+        scores.append(round(total, 1))
+    return scores
+
+
+def score_ir(industry: str, policies: Sequence[ScoringPolicy], state: Optional[IRState] = None) -> List[float]:
+    """
+    IR score per policy from one lookup of the industry's raw factor scores.
+    """
+    result = calculate_ir(industry, state)
+    raw_scores = [f["raw_score"] for f in result["factors"]]
+
+    scores = []
+    for policy in policies:
+        if policy.ir_factor_weight == FACTOR_WEIGHT:
+            scores.append(result["ir_score"])
+            continue
+        total = 0.0
+        for raw in raw_scores:
+            total += raw * policy.ir_factor_weight
+        scores.append(round(total, 3))
+    return scores
+
+
+def score_fr(inputs: Dict[str, Dict[str, float]], policies: Sequence[ScoringPolicy]) -> List[Dict[str, Any]]:
+    """
+    calculate_fr_score once per policy; the ratios are computed only once.
+    """
+    years = sorted(inputs.keys())
+    if len(years) < 3:
+        raise ValueError("At least 3 years of data required")
+
+    vectors = window_vectors(APARFinancialModel(inputs), years[-3], years[-2], years[-1])
+    return [score_vectors(*vectors, weights=p.fr_weights, bands=p.fr_bands) for p in policies]
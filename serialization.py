@@ -0,0 +1,63 @@
+# serialization.py
+# JSON encoding/decoding for the scoring routes: orjson, then msgspec, then the stdlib.
+#
+# Set FAST_JSON=0 to force the stdlib. The fast encoders write NaN/inf
+# as null where the stdlib path raises; scores never contain either.
+import json
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from metrics import timed
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional
+    msgspec = None
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # same settings as starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+_FAST = os.environ.get("FAST_JSON", "1") != "0"
+
+if _FAST and orjson is not None:
+    BACKEND = "orjson"
+    loads = orjson.loads
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+elif _FAST and msgspec is not None:
+    BACKEND = "msgspec"
+    loads = msgspec.json.Decoder().decode
+    dumps = msgspec.json.Encoder().encode
+else:
+    BACKEND = "json"
+    loads = json.loads
+    dumps = _stdlib_dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with the fastest available encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
+
+
+def json_response(content: Any) -> FastJSONResponse:
+    """
+    Wrap a handler result directly so FastAPI skips jsonable_encoder.
+    Only for plain dict/list/str/number content.
+    """
+    return FastJSONResponse(content)
@@ -1,4 +1,7 @@
 # soa_logic.py
+from typing import Any, Dict, List, Optional
+
+from scorecard import ScoreSpace, compile_scorecard
 
 YEAR_IN_BUSINESS_SCORE = {
     1: 600,
@@ -53,14 +56,40 @@ WEIGHTS = {
     "nationalization": 0.15
 }
 
-def calculate_soa_score(inputs: dict) -> float:
-    total = 0
+# ---------- scorecard ----------
+
+_FIELD_SCORES = {
+    "year_in_business": YEAR_IN_BUSINESS_SCORE,
+    "location": LOCATION_SCORE,
+    "relationship_age": RELATIONSHIP_AGE_SCORE,
+    "auditor_quality": AUDITOR_QUALITY_SCORE,
+    "auditor_opinion": AUDITOR_OPINION_SCORE,
+    "nationalization": NATIONALIZATION_SCORE
+}
+
+SOA_SCORECARD = compile_scorecard({
+    "name": "soa",
+    "round": 1,
+    "fields": {field: {"weight": weight, "points": _FIELD_SCORES[field]} for field, weight in WEIGHTS.items()}
+})
+
+# every input combination scored once at import, indexed by mixed-radix code
+SOA_SPACE = ScoreSpace(SOA_SCORECARD)
+
+# calculate_soa_score(inputs: dict) -> float
+# Weighted points rounded to 1 decimal; ValueError on a missing field or unknown code.
+calculate_soa_score = SOA_SPACE.score
+
 
-    total += YEAR_IN_BUSINESS_SCORE[inputs["year_in_business"]] * WEIGHTS["year_in_business"]
-    total += LOCATION_SCORE[inputs["location"]] * WEIGHTS["location"]
-    total += RELATIONSHIP_AGE_SCORE[inputs["relationship_age"]] * WEIGHTS["relationship_age"]
-    total += AUDITOR_QUALITY_SCORE[inputs["auditor_quality"]] * WEIGHTS["auditor_quality"]
-    total += AUDITOR_OPINION_SCORE[inputs["auditor_opinion"]] * WEIGHTS["auditor_opinion"]
-    total += NATIONALIZATION_SCORE[inputs["nationalization"]] * WEIGHTS["nationalization"]
+# ---------- batch scoring ----------
 
-    return round(total, 1)
+def calculate_soa_scores(
+    rows: Optional[List[Dict[str, int]]] = None,
+    columns: Optional[Dict[str, List[Optional[int]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Score many borrowers at once from columnar code arrays (or row dicts).
+    Invalid rows get a None score and an entry in "errors".
+    """
+    scores, errors = SOA_SPACE.score_batch(rows=rows, columns=columns)
+    return {"soa_scores": scores, "errors": errors}
@@ -0,0 +1,98 @@
+# stream_scoring.py
+# NDJSON bulk scoring: one record in, one result out, never the whole body in memory.
+#
+# Input line:  {"type": "coa" | "soa" | "ir" | "fr", "id": <any>, "payload": {...}}
+#   ir payload is {"industry": "..."}; the others match their /score endpoints.
+# Output line: {"id": ..., "type": ..., "result": {...}}  or  {"id": ..., "type": ..., "error": "..."}
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from coa_logic import calculate_coa_score
+from soa_logic import calculate_soa_score
+from ir_model import calculate_ir
+from fr_logic import calculate_fr_score
+from serialization import dumps
+
+
+# a single record larger than this ends the stream with an error line
+MAX_RECORD_BYTES = 1 << 20
+
+_SCORERS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "coa": lambda p: {"coa_score": calculate_coa_score(p)},
+    "soa": lambda p: {"soa_score": calculate_soa_score(p)},
+    "ir": lambda p: {"ir_score": calculate_ir(p["industry"])["ir_score"]},
+    "fr": calculate_fr_score,
+}
+
+
+def score_record(line: bytes) -> bytes:
+    """
+    Score one NDJSON record and return its result line (newline included).
+    Never raises: bad records produce an error line.
+    """
+    record_id = None
+    record_type = None
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Record must be a JSON object")
+        record_id = record.get("id")
+        record_type = record.get("type")
+        scorer = _SCORERS.get(record_type)
+        if scorer is None:
+            raise ValueError(f"Unknown record type: {record_type!r}")
+        out = {"id": record_id, "type": record_type, "result": scorer(record.get("payload"))}
+    except Exception as e:
+        out = {"id": record_id, "type": record_type, "error": str(e) or type(e).__name__}
+    return dumps(out) + b"\n"
+
+
+async def score_ndjson_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Consume request body chunks and yield result lines, one batch per chunk.
+
+    The next chunk is only read once the previous results have been handed to
+    the server, so a slow client stalls reading instead of growing a buffer.
+    Memory is bounded by one chunk plus one partial record.
+    """
+    pending = bytearray()
+    async for chunk in chunks:
+        pending += chunk
+        out: List[bytes] = []
+        start = 0
+        while True:
+            nl = pending.find(b"\n", start)
+            if nl < 0:
+                break
+            line = pending[start:nl]
+            if line.strip():
+                out.append(score_record(line))
+            start = nl + 1
+        del pending[:start]
+
+        if out:
+            yield b"".join(out)
+        if len(pending) > MAX_RECORD_BYTES:
+            yield dumps({"error": f"Record exceeds {MAX_RECORD_BYTES} bytes"}) + b"\n"
+            return
+
+    if pending.strip():
+        yield score_record(pending)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves receive() to the request body reader.
+
+    Under ASGI specs older than 2.4 Starlette polls receive() for disconnects
+    while streaming, which would steal body chunks from request.stream().
+    A disconnect still surfaces here: reading raises ClientDisconnect and
+    sending fails.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
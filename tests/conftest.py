@@ -0,0 +1,34 @@
+# Shared setup for the test suite: the repo root on sys.path (the modules are
+# flat, not a package), FastAPI/Pydantic deprecation noise silenced, and the
+# sample COA/SOA payloads most tests start from.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLES = {
+    "coa": {"bounce_cheques": 1, "ongoing_relationship": 2, "delay_installments": 3,
+            "delinquency_history": 4, "write_off": 1, "fraud_litigation": 2},
+    "soa": {"year_in_business": 1, "location": 2, "relationship_age": 3,
+            "auditor_quality": 4, "auditor_opinion": 5, "nationalization": 1},
+}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("filterwarnings", "ignore::DeprecationWarning")
+
+
+@pytest.fixture
+def sample_payload():
+    """sample_payload("coa") / sample_payload("soa"): a fresh copy of a valid payload."""
+    return lambda kind: dict(SAMPLES[kind])
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from app import app
+    return TestClient(app)
@@ -0,0 +1,24 @@
+# Batch endpoints report bad rows one by one; no single code may fail the whole batch.
+import pytest
+
+from coa_logic import calculate_coa_score
+from soa_logic import calculate_soa_score
+
+HUGE = [2 ** 63, 2 ** 64 + 5, -2 ** 63 - 1, 10 ** 30]
+
+
+@pytest.mark.parametrize("kind,scorer", [("coa", calculate_coa_score), ("soa", calculate_soa_score)])
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_out_of_range_codes_are_row_errors(client, sample_payload, kind, scorer, layout):
+    valid = sample_payload(kind)
+    field = next(iter(valid))
+    rows = [dict(valid)] + [{**valid, field: code} for code in HUGE] + [{**valid, field: -1}, dict(valid)]
+    body = {"rows": rows} if layout == "rows" else {"columns": {f: [r[f] for r in rows] for f in valid}}
+
+    response = client.post(f"/{kind}/score/batch", json=body)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result[f"{kind}_scores"] == [scorer(valid)] + [None] * (len(HUGE) + 1) + [scorer(valid)]
+    assert result["errors"] == [
+        {"index": i, "error": f"Invalid code {rows[i][field]} for {field}"} for i in range(1, len(HUGE) + 2)
+    ]
@@ -0,0 +1,76 @@
+# /coa/score and /soa/score decode their bodies by hand (fast_decode.CodeDecoder).
+# Both the OpenAPI document and the responses must match what FastAPI produces
+# for the plain `payload: Model` routes they replaced.
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import CoaInput, SoaInput, app
+from coa_logic import calculate_coa_score
+from soa_logic import calculate_soa_score
+
+
+# the baseline routes: a Pydantic body parameter, no hand-written decoding
+reference = FastAPI()
+
+
+@reference.post("/coa/score")
+def get_coa_score(payload: CoaInput):
+    return {"coa_score": calculate_coa_score(payload.dict())}
+
+
+@reference.post("/soa/score")
+def get_soa_score(payload: SoaInput):
+    return {"soa_score": calculate_soa_score(payload.dict())}
+
+
+BODIES = [
+    lambda valid: json.dumps(valid),
+    lambda valid: json.dumps({**valid, next(iter(valid)): 1.0}),
+    lambda valid: json.dumps({**valid, next(iter(valid)): "2"}),
+    lambda valid: json.dumps({**valid, next(iter(valid)): 99}),
+    lambda valid: json.dumps({k: v for k, v in list(valid.items())[1:]}),
+    lambda valid: json.dumps([valid]),
+    lambda valid: "null",
+    lambda valid: "{not json",
+    lambda valid: "\ufeff" + json.dumps(valid),
+    lambda valid: json.dumps({**valid, next(iter(valid)): 2 ** 70}),
+    lambda valid: b"\xff" + json.dumps(valid).encode(),
+    lambda valid: "",
+]
+CONTENT_TYPES = [None, "application/json", "application/json; charset=utf-8",
+                 "application/problem+json", "text/plain", "application/x-www-form-urlencoded"]
+
+
+def _outcome(client, path, body, headers):
+    # some 422s echo undecodable input, which the test client itself cannot render
+    try:
+        response = client.post(path, content=body, headers=headers)
+    except Exception as e:
+        return type(e)
+    return response.status_code, response.json()
+
+
+@pytest.mark.parametrize("path", ["/coa/score", "/soa/score"])
+def test_openapi_matches_model_route(path):
+    ours = app.openapi()["paths"][path]["post"]
+    baseline = reference.openapi()["paths"][path]["post"]
+    assert ours["requestBody"] == baseline["requestBody"]
+    assert ours["responses"] == baseline["responses"]
+
+    ours_schemas = app.openapi()["components"]["schemas"]
+    for name, schema in reference.openapi()["components"]["schemas"].items():
+        assert ours_schemas[name] == schema
+
+
+@pytest.mark.parametrize("content_type", CONTENT_TYPES)
+@pytest.mark.parametrize("make_body", BODIES)
+@pytest.mark.parametrize("kind", ["coa", "soa"])
+def test_responses_match_model_route(client, sample_payload, kind, make_body, content_type):
+    path = f"/{kind}/score"
+    valid = sample_payload(kind)
+    body = make_body(valid)
+    headers = {} if content_type is None else {"content-type": content_type}
+    assert _outcome(client, path, body, headers) == _outcome(TestClient(reference), path, body, headers)
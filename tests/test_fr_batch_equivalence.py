@@ -0,0 +1,116 @@
+# Batch FR scoring must give exactly what /fr/score gives for the same payload,
+# including values that sit on a 3-decimal rounding tie.
+import copy
+import random
+
+import pytest
+
+from app import FR_EXAMPLE
+from fr_logic import calculate_fr_score
+from fr_portfolio import calculate_fr_scores, round_scalar
+from fr_sensitivity import calculate_fr_sensitivity
+
+
+def _scaled(rnd: random.Random) -> dict:
+    return {
+        year: {metric: round(value * rnd.uniform(0.5, 2.0), 1) for metric, value in fin.items()}
+        for year, fin in FR_EXAMPLE.items()
+    }
+
+
+def _scalar(payload: dict):
+    try:
+        return calculate_fr_score(payload)["total_score"]
+    except ZeroDivisionError:
+        return None
+
+
+def _tie_payloads(n: int, seed: int) -> list:
+    # ratios landing on x.xxx5 in every year, so the blended value is a tie too
+    rnd = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        payload = _scaled(rnd)
+        npm = rnd.choice([0.0495, 0.1495, 0.0995, 0.0195])
+        current = rnd.choice([1.2495, 1.4995, 0.9995])
+        for fin in payload.values():
+            fin["Net Profit"] = npm * fin["Net Sales"]
+            fin["Current Assets"] = current * fin["Current Liabilities"]
+        payloads.append(payload)
+    return payloads
+
+
+@pytest.mark.parametrize("payloads", [
+    [_scaled(random.Random(seed)) for seed in range(500)],
+    _tie_payloads(200, 1),
+], ids=["random", "ties"])
+def test_batch_matches_scalar(payloads):
+    batch = calculate_fr_scores(payloads=payloads)["fr_scores"]
+    assert batch == [_scalar(p) for p in payloads]
+
+
+def test_documented_tie():
+    payload = copy.deepcopy(FR_EXAMPLE)
+    for fin in payload.values():
+        fin["Net Profit"] = 0.1495 * fin["Net Sales"]
+    expected = calculate_fr_score(payload)
+    assert calculate_fr_scores(payloads=[payload])["fr_scores"] == [expected["total_score"]]
+
+
+def test_history_year_needs_only_net_sales():
+    first = min(FR_EXAMPLE)
+    payload = copy.deepcopy(FR_EXAMPLE)
+    payload[first] = {"Net Sales": FR_EXAMPLE[first]["Net Sales"]}
+    result = calculate_fr_scores(payloads=[payload])
+    assert result == {"fr_scores": [calculate_fr_score(payload)["total_score"]], "errors": []}
+
+    del payload[first]["Net Sales"]
+    assert calculate_fr_scores(payloads=[payload])["errors"] == [
+        {"index": 0, "error": f"Missing metric 'Net Sales' in year {first}"}
+    ]
+
+
+def test_round_scalar_matches_round():
+    rnd = random.Random(0)
+    values = [k / 1000 + 0.0005 for k in range(-5000, 5000)]
+    values += [rnd.uniform(-1e6, 1e6) for _ in range(5000)] + [2.0 ** 60, -1e300]
+    assert round_scalar(values, 3).tolist() == [round(v, 3) for v in values]
+
+
+def test_sensitivity_matches_scalar():
+    rnd = random.Random(2)
+    for payload in _tie_payloads(20, 3) + [_scaled(rnd) for _ in range(20)]:
+        perturbations = [
+            {"metric": rnd.choice(list(FR_EXAMPLE["2024"])), "change_percent": rnd.choice([-100, -10, 0, 2.5, 50])}
+            for _ in range(10)
+        ]
+        result = calculate_fr_sensitivity(payload, perturbations)
+        for p, scenario in zip(perturbations, result["scenarios"]):
+            changed = copy.deepcopy(payload)
+            for fin in changed.values():
+                fin[p["metric"]] *= 1 + p["change_percent"] / 100
+            assert scenario.get("total_score") == _scalar(changed)
+
+
+def test_sensitivity_with_sparse_history_year():
+    first = min(FR_EXAMPLE)
+    payload = copy.deepcopy(FR_EXAMPLE)
+    payload[first] = {"Net Sales": FR_EXAMPLE[first]["Net Sales"]}
+    perturbations = [{"metric": "Net Sales", "change_percent": -10}, {"metric": "COGS", "change_percent": 5}]
+    result = calculate_fr_sensitivity(payload, perturbations)
+    assert result["base"] == calculate_fr_score(payload)
+    for p, scenario in zip(perturbations, result["scenarios"]):
+        changed = copy.deepcopy(payload)
+        for fin in changed.values():
+            if p["metric"] in fin:
+                fin[p["metric"]] *= 1 + p["change_percent"] / 100
+        assert scenario["total_score"] == _scalar(changed)
+
+    del payload[max(FR_EXAMPLE)]["COGS"]
+    with pytest.raises(ValueError, match=f"Missing metric 'COGS' in year {max(FR_EXAMPLE)}"):
+        calculate_fr_sensitivity(payload)
+
+
+def test_sensitivity_rejects_empty_years():
+    with pytest.raises(ValueError, match="years must be a non-empty list"):
+        calculate_fr_sensitivity(FR_EXAMPLE, [{"metric": "COGS", "change_percent": 5, "years": []}])
@@ -0,0 +1,26 @@
+# /fr/score ETags must change whenever the FR weights or bands behind them do.
+import app as app_module
+from app import FR_EXAMPLE
+from scoring_policy import PRODUCTION, compile_policy
+
+
+def test_fingerprint_follows_weights_and_bands():
+    production = compile_policy(PRODUCTION)
+    assert compile_policy("same").fr_fingerprint == production.fr_fingerprint
+    assert compile_policy("w", {"fr_weights": {"DSCR": 0.2}}).fr_fingerprint != production.fr_fingerprint
+    assert compile_policy("b", {"fr_rules": {"DSCR": [[3.0, 600]]}}).fr_fingerprint != production.fr_fingerprint
+    # COA/SOA changes do not touch FR responses
+    assert compile_policy("c", {"coa_weights": {"write_off": 0.3}}).fr_fingerprint == production.fr_fingerprint
+
+
+def test_etag_changes_with_fr_policy(client, monkeypatch):
+    first = client.post("/fr/score", json=FR_EXAMPLE)
+    etag = first.headers["etag"]
+    assert client.post("/fr/score", json=FR_EXAMPLE, headers={"If-None-Match": etag}).status_code == 304
+
+    # a deploy with different FR weights: same payload, new ETag, no 304
+    changed = compile_policy(PRODUCTION, {"fr_weights": {"DSCR": 0.2}})
+    monkeypatch.setitem(app_module.POLICIES, PRODUCTION, changed)
+    response = client.post("/fr/score", json=FR_EXAMPLE, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
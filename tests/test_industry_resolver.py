@@ -0,0 +1,31 @@
+# Typo-tolerant industry names must never silently land on a sibling industry.
+import pytest
+
+import ir_model
+from industry_resolver import MIN_CONFIDENCE
+
+DURABLE = "Wholesale Trade - DurableGoods"
+NONDURABLE = "Wholesale Trade - Nondurable Goods"
+
+
+@pytest.mark.parametrize("query,industry", [
+    ("Wholesale Trade - Durble Goods", DURABLE),
+    ("Wholesale Trade - Nondurble Goods", NONDURABLE),
+    ("Lether Products Manufacturing", "Leather Products Manufacturing"),
+    ("Papr Products Manufacturing", "Paper Products Manufacturing"),
+    ("Forrestry Fisheries and Hunting", "Forestry, Fisheries and Hunting"),
+])
+def test_clear_typos_resolve(query, industry):
+    match = ir_model.current_state().resolver.resolve(query)
+    assert match is not None and match.industry == industry
+
+
+@pytest.mark.parametrize("query", ["Wholesale Trade - Ndurable Goods", "Paether Products Manufacturing"])
+def test_near_tie_between_siblings_is_ambiguous(query, client):
+    resolver = ir_model.current_state().resolver
+    ranked = resolver.suggest(query, 2)
+    # both clear MIN_CONFIDENCE, neither by a margin
+    assert ranked[1].confidence >= MIN_CONFIDENCE
+    assert resolver.resolve(query) is None
+    assert client.post("/ir/score", json={"industry": query}).status_code != 200
+
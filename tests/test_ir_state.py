@@ -0,0 +1,65 @@
+# A policy reload may swap ir_model's state at any moment; one request must
+# still see a single version from name resolution to the score it returns,
+# and data with unresolvable factor values must fail to compile, not swap in.
+import pytest
+
+import app as app_module
+import ir_model
+from industry_data import INDUSTRY_DATA
+from ir_model import compile_ir_state, swap_state
+
+
+class _SwappingResolver:
+    """Resolves with the wrapped resolver, then swaps in another state mid-request."""
+
+    def __init__(self, resolver, swap_to):
+        self._resolver = resolver
+        self._swap_to = swap_to
+
+    def resolve(self, name):
+        match = self._resolver.resolve(name)
+        swap_state(self._swap_to)
+        return match
+
+    def suggest(self, name):
+        return self._resolver.suggest(name)
+
+
+def test_ir_score_uses_one_state_across_a_swap(client):
+    industry = sorted(INDUSTRY_DATA)[0]
+    original = ir_model.current_state()
+    # the next version no longer has the industry at all
+    without = compile_ir_state({k: v for k, v in INDUSTRY_DATA.items() if k != industry}, source="next")
+    try:
+        for query in ("", "?compare=production"):
+            swap_state(original._replace(resolver=_SwappingResolver(original.resolver, without)))
+            response = client.post(f"/ir/score{query}", json={"industry": industry.lower()})
+            assert response.status_code == 200, response.text
+            assert response.json()["ir_score"] == original.table[industry]["ir_score"]
+            assert ir_model.current_state() is without
+    finally:
+        swap_state(original)
+
+
+def test_ir_matrix_renders_the_state_it_is_cached_against():
+    rendered = []
+    cache = app_module.PrecompressedCache(ir_model.current_state, lambda state: rendered.append(state) or b"{}")
+    cache.get()
+    assert rendered == [ir_model.current_state()]
+
+
+@pytest.mark.parametrize("value", ["", "  ", "-", "/", "H", "HI"])
+def test_blank_or_too_short_values_are_rejected(value):
+    entry = ir_model._resolve_factor("Environmental Concerns")
+    assert ir_model._lookup_score(entry, value) is None
+
+    industry = sorted(INDUSTRY_DATA)[0]
+    data = {**INDUSTRY_DATA, industry: {**INDUSTRY_DATA[industry], "Environmental Concerns": value}}
+    with pytest.raises(ValueError, match="Environmental Concerns"):
+        compile_ir_state(data, source="bad")
+
+
+@pytest.mark.parametrize("value,score", [("HIG", 150), ("mod", 300), ("Very High", 0), ("LOWER", 450)])
+def test_loose_values_still_resolve(value, score):
+    entry = ir_model._resolve_factor("Environmental Concerns")
+    assert ir_model._lookup_score(entry, value) == score
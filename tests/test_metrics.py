@@ -0,0 +1,72 @@
+# Multiprocess metrics: totals reach the shared directory without further
+# requests, at exit, and files of workers that are gone stop being counted.
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import metrics
+from metrics import Registry
+
+
+@pytest.fixture
+def multiproc_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "FLUSH_SECONDS", 0.01)
+    return tmp_path
+
+
+def _own_file(directory):
+    return directory / f"metrics_{os.getpid()}.json"
+
+
+def _requests(directory):
+    try:
+        return json.loads(_own_file(directory).read_text())["requests"]
+    except (OSError, ValueError):
+        return None
+
+
+def test_idle_worker_flushes_in_background(multiproc_dir):
+    registry = Registry()
+    try:
+        registry.observe_request("/coa/score", 200, 0.001, {})
+        registry.observe_request("/coa/score", 200, 0.001, {})
+        # no further requests arrive; the last one must still be written
+        expected = [["/coa/score", "200", 2]]
+        deadline = time.monotonic() + 5
+        while _requests(multiproc_dir) != expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _requests(multiproc_dir) == expected
+    finally:
+        registry.close()
+
+
+def test_close_writes_the_last_window(multiproc_dir, monkeypatch):
+    monkeypatch.setattr(metrics, "FLUSH_SECONDS", 3600)
+    registry = Registry()
+    registry.observe_request("/soa/score", 200, 0.001, {})
+    registry.observe_request("/soa/score", 422, 0.001, {})
+    assert not _own_file(multiproc_dir).exists()
+    registry.close()
+    assert sorted(_requests(multiproc_dir)) == [["/soa/score", "200", 1], ["/soa/score", "422", 1]]
+
+
+def test_scrape_drops_files_of_dead_workers(multiproc_dir):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    alive = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        for pid in (dead.pid, alive.pid):
+            snapshot = {"requests": [["/ir/score", "200", pid]], "histograms": []}
+            (multiproc_dir / f"metrics_{pid}.json").write_text(json.dumps(snapshot))
+
+        requests = Registry().collect()["requests"]
+        assert requests == [["/ir/score", "200", alive.pid]]
+        assert not (multiproc_dir / f"metrics_{dead.pid}.json").exists()
+    finally:
+        alive.kill()
+        alive.wait()
@@ -0,0 +1,33 @@
+# Policy selection is declared on every scoring route and honoured by profiled requests.
+import app as app_module
+import profiling
+from app import COMPARE_HEADER, FR_EXAMPLE, POLICY_HEADER
+from scoring_policy import compile_policy
+
+ROUTES = ["/coa/score", "/soa/score", "/ir/score", "/fr/score", "/score/full"]
+
+
+def test_policy_parameters_documented():
+    paths = app_module.app.openapi()["paths"]
+    for route in ROUTES:
+        params = {(p["in"], p["name"]) for p in paths[route]["post"].get("parameters", [])}
+        assert {("query", "policy"), ("query", "compare")} <= params, route
+        assert {("header", POLICY_HEADER), ("header", COMPARE_HEADER)} <= params, route
+
+
+def test_profiled_fr_score_uses_policy_selection(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_SECRET", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(app_module.POLICIES, "alt", compile_policy("alt", {"fr_weights": {"DSCR": 0.2}}))
+
+    plain = client.post("/fr/score?compare=alt", json=FR_EXAMPLE).json()
+    response = client.post("/fr/score?compare=alt", json=FR_EXAMPLE, headers={"X-Profile": "s3cret"})
+    assert response.status_code == 200
+    assert response.headers["x-profile-id"]
+    assert response.json() == plain
+
+    # header selection and unknown names behave as on the unprofiled path
+    headed = client.post("/fr/score", json=FR_EXAMPLE, headers={"X-Profile": "s3cret", COMPARE_HEADER: "alt"})
+    assert headed.json() == plain
+    unknown = client.post("/fr/score?policy=nope", json=FR_EXAMPLE, headers={"X-Profile": "s3cret"})
+    assert unknown.status_code == 400
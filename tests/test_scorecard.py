@@ -0,0 +1,112 @@
+# Compiled scorecards must score exactly like the hand-written loops they replace.
+import itertools
+import random
+
+import pytest
+
+import coa_logic
+import soa_logic
+from fr_logic import BANDS, FR_SCORECARD, RATIO_NAMES, WEIGHTS, get_score
+from scorecard import compile_scorecard, round_scalar
+
+
+def _handwritten(score_map: dict, weights: dict, inputs: dict, digits: int):
+    total = 0
+    for field, weight in weights.items():
+        if field not in inputs:
+            raise ValueError(f"Missing field: {field}")
+        if inputs[field] not in score_map[field]:
+            raise ValueError(f"Invalid code {inputs[field]} for {field}")
+        total += score_map[field][inputs[field]] * weight
+    return round(total) if digits == 0 else round(total, digits)
+
+
+CARDS = [
+    (coa_logic.COA_SCORECARD, coa_logic.SCORE_MAP, coa_logic.WEIGHTS, 0),
+    (soa_logic.SOA_SCORECARD, soa_logic._FIELD_SCORES, soa_logic.WEIGHTS, 1),
+]
+
+
+def _rows(score_map: dict, seed: int) -> list:
+    rows = [dict(zip(score_map, combo)) for combo in itertools.product(*map(sorted, score_map.values()))]
+    rnd = random.Random(seed)
+    for _ in range(300):
+        row = {field: rnd.choice([None, -1, 0, 1, 2, 3, 5, 99]) for field in score_map}
+        rows.append({k: v for k, v in row.items() if v is not None or rnd.random() < 0.3})
+    return rows
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except ValueError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize("card,score_map,weights,digits", CARDS, ids=["coa", "soa"])
+def test_points_cards_match_handwritten(card, score_map, weights, digits):
+    rows = _rows(score_map, 0)
+    for row in rows:
+        if any(v is None for v in row.values()):
+            continue  # None is a batch-only notion of "missing"
+        assert repr(_outcome(card.score, row)) == repr(_outcome(_handwritten, score_map, weights, row, digits))
+
+    # rows go through score(), columns through numpy: both must agree
+    by_rows = card.score_batch(rows=rows)
+    columns = {field: [row.get(field) for row in rows] for field in score_map}
+    assert card.score_batch(columns=columns) == by_rows
+    for i, row in enumerate(rows):
+        if by_rows[0][i] is not None:
+            assert by_rows[0][i] == _handwritten(score_map, weights, row, digits)
+
+
+def test_fr_card_matches_get_score():
+    rnd = random.Random(1)
+    for _ in range(3000):
+        row = {m: rnd.choice([rnd.uniform(-2, 5), rnd.uniform(0, 100), float("nan")]) for m in RATIO_NAMES}
+        expected = 0.0
+        for m in RATIO_NAMES:
+            expected += get_score(m, row[m]) * WEIGHTS[m]
+        assert FR_SCORECARD.score(row) == round(expected, 3)
+    for m in RATIO_NAMES:
+        for bound in BANDS[m].bounds:
+            for value in (bound - 1e-9, bound, bound + 1e-9):
+                assert FR_SCORECARD.band(m, value) == get_score(m, value)
+
+
+@pytest.mark.parametrize("digits", [1, 2, 3])
+def test_generated_rounding_matches_round(digits):
+    values = [k / 10 ** digits + 0.5 / 10 ** digits for k in range(-3000, 3000)]
+    values += [random.Random(digits).uniform(-1e13, 1e13) for _ in range(5000)]
+    values += [0.0, -0.0, 0.04, -0.04, 0.0049, -0.0049, 2.0 ** 41, -1e300, 1e300]
+    # one code per value, weight 1: score() returns the rounded value itself
+    card = compile_scorecard({
+        "name": "x", "round": digits,
+        "fields": {"v": {"weight": 1.0, "points": dict(enumerate(values))}}
+    })
+    for code, value in enumerate(values):
+        total = 0
+        total += value * 1.0
+        assert repr(card.score({"v": code})) == repr(round(total, digits))
+
+
+def test_round_scalar_large_values():
+    values = [3e9 + 0.0005, 123456789.1235, 2.0 ** 35 + 0.5, 1e15 + 0.25, -7e10 - 0.0005]
+    assert round_scalar(values, 3).tolist() == [round(v, 3) for v in values]
+
+
+@pytest.mark.parametrize("round_digits,field,error", [
+    (0, {"weight": 1.0, "points": {-1: 600, 1: 0}}, "code -1"),
+    (0, {"weight": 1.0, "points": {"1": 600}}, "code '1'"),
+    (0, {"weight": 1.0, "points": {True: 600}}, "code True"),
+    (0, {"weight": 1.0, "points": {1: float("nan")}}, "points nan"),
+    (0, {"weight": float("inf"), "points": {1: 600}}, "non-finite weight"),
+    (0, {"weight": 1.0, "bands": [(float("inf"), 600), (1.0, 300)]}, "bound inf"),
+    (0, {"weight": 1.0, "bands": [(float("nan"), 600)]}, "bound nan"),
+    (0, {"weight": 1.0, "bands": [(1.0, float("-inf"))]}, "points -inf"),
+    (-1, {"weight": 1.0, "points": {1: 600}}, "round"),
+    (1.5, {"weight": 1.0, "points": {1: 600}}, "round"),
+])
+def test_invalid_specs_fail_at_compile_time(round_digits, field, error):
+    with pytest.raises(ValueError, match=error):
+        compile_scorecard({"name": "bad", "round": round_digits, "fields": {"f": field}})